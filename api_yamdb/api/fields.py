@@ -0,0 +1,38 @@
+from rest_framework import serializers
+
+
+class CachedSlugRelatedField(serializers.RelatedField):
+    """Slug-addressed relation resolved and rendered through a SlugCache.
+
+    Values are written as slugs and read back as {"name", "slug"} objects,
+    without touching the database once the cache is warm.
+    """
+
+    default_error_messages = {
+        "does_not_exist": "Object with slug={value} does not exist.",
+        "invalid": "Invalid value.",
+    }
+
+    def __init__(self, slug_cache, **kwargs):
+        self.slug_cache = slug_cache
+        kwargs.setdefault("queryset", slug_cache.model.objects.all())
+        super().__init__(**kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail("invalid")
+
+        entry = self.slug_cache.get(data)
+
+        if entry is None:
+            self.fail("does_not_exist", value=data)
+
+        return self.slug_cache.instance(entry)
+
+    def to_representation(self, value):
+        entry = self.slug_cache.get(value.pk, field="id")
+
+        return {"name": entry.name, "slug": entry.slug}
@@ -1,13 +1,32 @@
 from django_filters import CharFilter, FilterSet, NumberFilter
+from reviews.cache import category_cache, genre_cache
 from reviews.models import Title
 
 
 class TitleFilter(FilterSet):
-    category = CharFilter(field_name="category__slug", lookup_expr="exact")
-    genre = CharFilter(field_name="genre__slug", lookup_expr="exact")
+    category = CharFilter(method="filter_category")
+    genre = CharFilter(method="filter_genre")
     name = CharFilter(field_name="name", lookup_expr="contains")
     year = NumberFilter(field_name="year", lookup_expr="exact")
 
+    @staticmethod
+    def filter_category(queryset, name, value):
+        category = category_cache.get(value)
+
+        if category is None:
+            return queryset.none()
+
+        return queryset.filter(category_id=category.id)
+
+    @staticmethod
+    def filter_genre(queryset, name, value):
+        genre = genre_cache.get(value)
+
+        if genre is None:
+            return queryset.none()
+
+        return queryset.filter(genre=genre.id)
+
     class Meta:
         model = Title
         fields = ("category", "genre", "name", "year")
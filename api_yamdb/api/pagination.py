@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Keyset paging over (pub_date, id), newest first."""
+
+    ordering = ("-pub_date", "-id")
+    page_size_query_param = "limit"
+    max_page_size = 100
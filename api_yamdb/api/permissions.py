@@ -43,3 +43,15 @@ class IsAdmin(permissions.BasePermission):
             and request.user.is_authenticated
             and (request.user.role == "admin" or request.user.is_staff)
         )
+
+
+class IsModerator(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return (
+            request.user
+            and request.user.is_authenticated
+            and (
+                request.user.role in ("admin", "moderator")
+                or request.user.is_staff
+            )
+        )
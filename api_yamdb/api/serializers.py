@@ -1,14 +1,50 @@
 import datetime as dt
+import json
+from collections import defaultdict
 
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Manager
 from rest_framework import exceptions, serializers
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Comment, Genre, Review, Title, User
-
+from reviews.cache import category_cache, genre_cache
+from reviews.changes import record_changes
+from reviews.inserts import bulk_insert_returns_ids, insert_ignoring_conflicts
+from reviews.models import (Category, Change, Comment, DeletionJob, Genre,
+                            Review, Title, TitleStats, User)
+from reviews.moderation import MODERATION_ACTIONS, MODERATION_TARGETS
+from reviews.stats import (attach_missing_stats, create_empty_stats,
+                           refresh_title_stats)
+
+from .fields import CachedSlugRelatedField
 from .validators import validate_username
 
 
+class OptionalFieldsMixin:
+    """Leaves out Meta.optional_fields unless asked for via ?include=a,b."""
+
+    @classmethod
+    def included_fields(cls, request):
+        """Optional fields requested by the client."""
+        if request is None:
+            return set()
+
+        include = request.query_params.get("include", "").split(",")
+
+        return set(getattr(cls.Meta, "optional_fields", ())) & set(include)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        include = self.included_fields(self.context.get("request"))
+
+        for field_name in getattr(self.Meta, "optional_fields", ()):
+            if field_name not in include:
+                fields.pop(field_name, None)
+
+        return fields
+
+
 class UserSerializer(serializers.ModelSerializer):
     def validate_username(self, value):
         return validate_username(value)
@@ -39,58 +75,260 @@ class UserMeSerializer(serializers.ModelSerializer):
         model = User
 
 
+class BulkListSerializer(serializers.ListSerializer):
+    """Base of the bulk endpoints' list serializers.
+
+    Every item is validated on its own, then the valid ones are checked
+    against each other and the database in validate_items(), and the errors
+    of both steps are returned together. Batches longer than max_length
+    (BULK_MAX_ITEMS) are rejected up front.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.max_length = kwargs.pop("max_length", settings.BULK_MAX_ITEMS)
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            return super().to_internal_value(data)
+
+        if len(data) > self.max_length:
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f"Не больше {self.max_length} объектов за запрос."
+                    ]
+                },
+                code="max_length",
+            )
+
+        attrs = []
+        errors = []
+
+        for item in data:
+            try:
+                attrs.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                attrs.append(None)
+                errors.append(dict(exc.detail))
+            else:
+                errors.append({})
+
+        for item_errors, batch_errors in zip(
+            errors, self.validate_items(attrs)
+        ):
+            for field, messages in batch_errors.items():
+                item_errors.setdefault(field, []).extend(messages)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return attrs
+
+    def validate_items(self, attrs):
+        """Errors of each item found across the batch.
+
+        Items that failed their own validation are None in attrs.
+        """
+        return [{} for _ in attrs]
+
+
+class SlugBulkListSerializer(BulkListSerializer):
+    """Bulk create for slug-addressed models (genres, categories)."""
+
+    def validate_items(self, attrs):
+        model = self.child.Meta.model
+        slugs = [item["slug"] for item in attrs if item is not None]
+        existing = set(
+            model.objects.filter(slug__in=slugs).values_list("slug", flat=True)
+        )
+        seen = set()
+        errors = []
+
+        for item in attrs:
+            if item is not None and (
+                item["slug"] in existing or item["slug"] in seen
+            ):
+                errors.append({"slug": ["Такой slug уже существует."]})
+            else:
+                errors.append({})
+
+            if item is not None:
+                seen.add(item["slug"])
+
+        return errors
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+
+        return model.objects.bulk_create(
+            model(**item) for item in validated_data
+        )
+
+
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ("name", "slug")
         model = Genre
 
 
+class GenreBulkSerializer(GenreSerializer):
+    slug = serializers.SlugField(max_length=50)
+
+    class Meta(GenreSerializer.Meta):
+        list_serializer_class = SlugBulkListSerializer
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         fields = ("name", "slug")
         model = Category
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
+def set_title_genres(genres_by_title, created=False):
+    """Sync genre links of many titles, touching only changed through rows.
+
+    Current links are read with one query (skipped for freshly created
+    titles), stale links are removed with one delete and missing ones are
+    added with one bulk insert.
+    """
+    through = Title.genre.through
+    links = defaultdict(dict)
+
+    if not created:
+        for pk, title_id, genre_id in through.objects.filter(
+            title_id__in=genres_by_title
+        ).values_list("pk", "title_id", "genre_id"):
+            links[title_id][genre_id] = pk
+
+    stale = []
+    missing = []
+
+    for title_id, genres in genres_by_title.items():
+        wanted = {genre.pk for genre in genres}
+        current = links[title_id]
+
+        stale.extend(
+            pk for genre_id, pk in current.items() if genre_id not in wanted
+        )
+        missing.extend(
+            through(title_id=title_id, genre_id=genre_id)
+            for genre_id in wanted - current.keys()
+        )
+
+    if stale:
+        through.objects.filter(pk__in=stale).delete()
+
+    if missing:
+        through.objects.bulk_create(missing)
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    PERCENTILES = (25, 50, 75, 90)
+
+    mean = serializers.FloatField(source="rating")
+    histogram = serializers.SerializerMethodField()
+    percentiles = serializers.SerializerMethodField()
+
+    @staticmethod
+    def get_histogram(obj: TitleStats):
+        return {
+            str(score): count for score, count in obj.get_histogram().items()
+        }
+
+    def get_percentiles(self, obj: TitleStats):
+        percentiles = {}
+
+        if not obj.review_count:
+            return percentiles
+
+        histogram = obj.get_histogram().items()
+
+        for percentile in self.PERCENTILES:
+            rank = obj.review_count * percentile / 100
+            seen = 0
+
+            for score, count in histogram:
+                seen += count
+
+                if seen >= rank:
+                    percentiles[f"p{percentile}"] = score
+                    break
+
+        return percentiles
+
+    class Meta:
+        fields = (
+            "review_count",
+            "mean",
+            "histogram",
+            "percentiles",
+            "last_review_at",
+        )
+        model = TitleStats
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        titles = list(data.all() if isinstance(data, Manager) else data)
+        attach_missing_stats(titles)
+
+        return super().to_representation(titles)
+
+
+class TitleSerializer(OptionalFieldsMixin, serializers.ModelSerializer):
+    genre = CachedSlugRelatedField(
+        slug_cache=genre_cache,
         many=True,
         required=True,
-        slug_field="slug",
     )
-    category = serializers.SlugRelatedField(
-        queryset=Category.objects.all(),
+    category = CachedSlugRelatedField(
+        slug_cache=category_cache,
         required=True,
-        slug_field="slug",
     )
     rating = serializers.SerializerMethodField()
+    stats = serializers.SerializerMethodField()
 
     @staticmethod
     def get_rating(obj: Title):
-        return obj.reviews.aggregate(Avg("score"))["score__avg"]
+        return obj.stats.rating
+
+    @staticmethod
+    def get_stats(obj: Title):
+        return TitleStatsSerializer(obj.stats).data
+
+    def to_representation(self, instance):
+        # A no-op for titles already handled by TitleListSerializer.
+        attach_missing_stats([instance])
+
+        return super().to_representation(instance)
 
     @staticmethod
     def process_data(validated_data, instance=None):
-        try:
-            genre = validated_data.pop("genre")
-        except KeyError:
-            genre = []
+        genre = validated_data.pop("genre", None)
 
         if instance is None:
             title = Title.objects.create(**validated_data)
         else:
             title = instance
+            dirty_fields = []
 
-        if genre:
-            title.genre.clear()
+            for attr, value in validated_data.items():
+                field = Title._meta.get_field(attr)
+                new_value = value
+
+                if field.is_relation and value is not None:
+                    new_value = value.pk
 
-            for genre_item in genre:
-                title.genre.add(genre_item)
+                if getattr(title, field.attname) != new_value:
+                    setattr(title, attr, value)
+                    dirty_fields.append(attr)
 
-        for attr, value in validated_data.items():
-            setattr(title, attr, value)
+            if dirty_fields:
+                title.save(update_fields=dirty_fields)
 
-        title.save()
+        if genre:
+            set_title_genres({title.pk: genre}, created=instance is None)
 
         return title
 
@@ -108,12 +346,6 @@ class TitleSerializer(serializers.ModelSerializer):
 
         return value
 
-    def to_representation(self, obj: Title):
-        self.fields["genre"] = GenreSerializer(many=True)
-        self.fields["category"] = CategorySerializer()
-
-        return super().to_representation(obj)
-
     class Meta:
         fields = (
             "id",
@@ -123,8 +355,149 @@ class TitleSerializer(serializers.ModelSerializer):
             "description",
             "genre",
             "category",
+            "stats",
         )
+        optional_fields = ("stats",)
         model = Title
+        list_serializer_class = TitleListSerializer
+
+
+class TitleBulkListSerializer(BulkListSerializer):
+    """Validates a batch of titles together and writes it in bulk.
+
+    Genre and category slugs of the whole batch are resolved with one query
+    per model instead of one query per slug.
+    """
+
+    def validate_items(self, attrs):
+        valid = [item for item in attrs if item is not None]
+        self._genres = genre_cache.get_many(
+            {slug for item in valid for slug in item.get("genre", ())}
+        )
+        self._categories = category_cache.get_many(
+            {item["category"] for item in valid if "category" in item}
+        )
+        self._titles = {}
+
+        if self.instance is not None:
+            self._titles = self.instance.in_bulk(
+                {item["id"] for item in valid if "id" in item}
+            )
+
+        errors = []
+
+        for item in attrs:
+            item_errors = {}
+            errors.append(item_errors)
+
+            if item is None:
+                continue
+
+            missing = [
+                slug
+                for slug in item.get("genre", ())
+                if slug not in self._genres
+            ]
+
+            if missing:
+                item_errors["genre"] = [
+                    f"Жанр '{slug}' не найден." for slug in missing
+                ]
+
+            if (
+                "category" in item
+                and item["category"] not in self._categories
+            ):
+                item_errors["category"] = [
+                    f"Категория '{item['category']}' не найдена."
+                ]
+
+            if self.instance is not None and item.get("id") not in (
+                self._titles
+            ):
+                item_errors["id"] = ["Произведение не найдено."]
+
+        return errors
+
+    def to_internal_value(self, data):
+        attrs = super().to_internal_value(data)
+
+        for item in attrs:
+            if "genre" in item:
+                item["genre"] = [
+                    genre_cache.instance(self._genres[slug])
+                    for slug in item["genre"]
+                ]
+
+            if "category" in item:
+                item["category"] = category_cache.instance(
+                    self._categories[item["category"]]
+                )
+
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        genres = [item.pop("genre", []) for item in validated_data]
+        titles = [Title(**item) for item in validated_data]
+
+        if bulk_insert_returns_ids(Title):
+            Title.objects.bulk_create(titles)
+            record_changes(titles, "create")
+            create_empty_stats(titles)
+        else:
+            # Saved one by one to get their ids; post_save then logs the
+            # titles and creates their stats rows.
+            for title in titles:
+                title.save(force_insert=True)
+
+        set_title_genres(
+            {title.pk: genre for title, genre in zip(titles, genres)},
+            created=True,
+        )
+
+        return titles
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        genres_by_title = {}
+        fields = set()
+        titles = []
+
+        for item in validated_data:
+            title = self._titles[item.pop("id")]
+
+            if "genre" in item:
+                genres_by_title[title.pk] = item.pop("genre")
+
+            for attr, value in item.items():
+                setattr(title, attr, value)
+
+            fields.update(item)
+            titles.append(title)
+
+        if fields:
+            Title.objects.bulk_update(titles, fields)
+
+        set_title_genres(genres_by_title)
+        record_changes(titles, "update")
+
+        return titles
+
+
+class TitleBulkSerializer(TitleSerializer):
+    genre = serializers.ListField(
+        child=serializers.SlugField(),
+        required=True,
+    )
+    category = serializers.SlugField(required=True)
+
+    class Meta(TitleSerializer.Meta):
+        list_serializer_class = TitleBulkListSerializer
+
+
+class TitleBulkUpdateSerializer(TitleBulkSerializer):
+    id = serializers.IntegerField()
 
 
 class AuthUserSignUpSerializer(serializers.ModelSerializer):
@@ -168,23 +541,110 @@ class AuthUserTokenSerializer(serializers.ModelSerializer):
         model = User
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(OptionalFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field="username",
     )
+    # Annotated by the views, see with_comment_activity.
+    comment_count = serializers.IntegerField(read_only=True)
+    last_comment_at = serializers.DateTimeField(read_only=True)
+
+    def create(self, validated_data):
+        review = Review(**validated_data)
 
-    def save(self, **kwargs):
-        try:
-            super().save(**kwargs)
-        except IntegrityError:
+        if not insert_ignoring_conflicts(review):
             raise serializers.ValidationError("Отзыв уже существует.")
 
+        return review
+
     class Meta:
-        fields = ("id", "text", "author", "score", "pub_date")
+        fields = (
+            "id",
+            "text",
+            "author",
+            "score",
+            "pub_date",
+            "comment_count",
+            "last_comment_at",
+        )
+        optional_fields = ("comment_count", "last_comment_at")
         model = Review
 
 
+class UserReviewSerializer(ReviewSerializer):
+    title_id = serializers.IntegerField(read_only=True)
+    title_name = serializers.CharField(source="title.name", read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ("title_id", "title_name")
+
+
+class ReviewBulkListSerializer(BulkListSerializer):
+    """Bulk review import for a single title, authors given by username."""
+
+    def validate_items(self, attrs):
+        title = self.context["title"]
+        usernames = {item["author"] for item in attrs if item is not None}
+        self._authors = User.objects.in_bulk(usernames, field_name="username")
+        reviewed = set(
+            Review.objects.filter(
+                title=title, author__username__in=usernames
+            ).values_list("author__username", flat=True)
+        )
+        errors = []
+
+        for item in attrs:
+            if item is None:
+                errors.append({})
+                continue
+
+            username = item["author"]
+
+            if username not in self._authors:
+                errors.append({"author": ["Пользователь не найден."]})
+            elif username in reviewed:
+                errors.append({"author": ["Отзыв уже существует."]})
+            else:
+                errors.append({})
+
+            reviewed.add(username)
+
+        return errors
+
+    def to_internal_value(self, data):
+        attrs = super().to_internal_value(data)
+
+        for item in attrs:
+            item["author"] = self._authors[item["author"]]
+
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        title = self.context["title"]
+        reviews = [Review(title=title, **item) for item in validated_data]
+
+        if bulk_insert_returns_ids(Review):
+            Review.objects.bulk_create(reviews)
+            record_changes(reviews, "create")
+            refresh_title_stats([title.pk])
+        else:
+            # Saved one by one to get their ids; post_save then logs the
+            # reviews and refreshes the title's stats.
+            for review in reviews:
+                review.save(force_insert=True)
+
+        return reviews
+
+
+class ReviewBulkSerializer(ReviewSerializer):
+    author = serializers.CharField()
+
+    class Meta(ReviewSerializer.Meta):
+        list_serializer_class = ReviewBulkListSerializer
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -194,3 +654,90 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ("id", "text", "author", "pub_date")
         model = Comment
+
+
+class UserCommentSerializer(CommentSerializer):
+    review_id = serializers.IntegerField(read_only=True)
+    title_id = serializers.IntegerField(
+        source="review.title_id", read_only=True
+    )
+    title_name = serializers.CharField(
+        source="review.title.name", read_only=True
+    )
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + (
+            "review_id",
+            "title_id",
+            "title_name",
+        )
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    data = serializers.SerializerMethodField()
+
+    @staticmethod
+    def get_data(obj: Change):
+        return json.loads(obj.data) if obj.data else None
+
+    class Meta:
+        fields = ("id", "table", "object_id", "action", "created", "data")
+        model = Change
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        fields = (
+            "id",
+            "target",
+            "object_id",
+            "status",
+            "total",
+            "deleted",
+            "error",
+            "heartbeat",
+            "created",
+            "updated",
+        )
+        model = DeletionJob
+
+
+class ModerationSerializer(serializers.Serializer):
+    """Moderation action and the rows it applies to: ids, author or title."""
+
+    action = serializers.ChoiceField(choices=MODERATION_ACTIONS)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, required=False
+    )
+    author = serializers.SlugRelatedField(
+        slug_field="username", queryset=User.objects.all(), required=False
+    )
+    title = serializers.PrimaryKeyRelatedField(
+        queryset=Title.objects.all(), required=False
+    )
+
+    def validate(self, attrs):
+        selectors = {"ids", "author", "title"} & attrs.keys()
+
+        if len(selectors) != 1:
+            raise serializers.ValidationError(
+                "Укажите ровно одно из полей: ids, author, title."
+            )
+
+        return attrs
+
+    def get_queryset(self, target):
+        """Rows of the target matching the validated selector."""
+        model = MODERATION_TARGETS[target][0]
+        data = self.validated_data
+
+        if "ids" in data:
+            return model.objects.filter(pk__in=data["ids"])
+
+        if "author" in data:
+            return model.objects.filter(author=data["author"])
+
+        if target == "comments":
+            return model.objects.filter(review__title=data["title"])
+
+        return model.objects.filter(title=data["title"])
@@ -2,8 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
 from .views import (AuthSignUpViewSet, AuthTokenViewSet, CategoryViewSet,
-                    CommentViewSet, GenreViewSet, ReviewViewSet, TitleViewSet,
-                    UserMeView, UserViewSet)
+                    ChangeFeedView, CommentViewSet, DeletionJobViewSet,
+                    ExportView, GenreViewSet, ModerationView, ReviewViewSet,
+                    TitleViewSet, UserMeView, UserViewSet)
 
 router = SimpleRouter()
 router.register("users", UserViewSet)
@@ -15,10 +16,16 @@ router.register(
     r"titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments",
     CommentViewSet,
 )
-router.register("auth/signup", AuthSignUpViewSet)
+router.register("auth/signup", AuthSignUpViewSet, basename="signup")
+router.register("deletion-jobs", DeletionJobViewSet)
 
 urlpatterns = [
-    path("auth/token/", AuthTokenViewSet.as_view()),
-    path("users/me/", UserMeView.as_view()),
+    path("auth/token/", AuthTokenViewSet.as_view(), name="token"),
+    path("users/me/", UserMeView.as_view(), name="user-me"),
+    path("export/<str:table>/", ExportView.as_view(), name="export"),
+    path("changes/", ChangeFeedView.as_view(), name="changes"),
+    path(
+        "moderation/<str:target>/", ModerationView.as_view(), name="moderation"
+    ),
     path("", include(router.urls)),
 ]
@@ -1,24 +1,64 @@
+from datetime import timedelta
 from uuid import uuid4
 
+from django.conf import settings
 from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch, Q
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, views, viewsets
+from rest_framework import (exceptions, filters, permissions, status, views,
+                            viewsets)
+from rest_framework.decorators import action
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.deletion import delete_reviews
+from reviews.export import EXPORT_FORMATS, EXPORT_TABLES, stream_table
+from reviews.models import (Category, Change, Comment, DeletionJob, Genre,
+                            Review, Title, User)
+from reviews.moderation import MODERATION_TARGETS, moderate
+from reviews.stats import attach_missing_stats
+
+from api_yamdb import metrics
 
 from .filtersets import TitleFilter
-from .permissions import IsAdmin, IsAdminOrAuthor, IsAdminOrReadOnly
+from .pagination import PubDateCursorPagination
+from .permissions import (IsAdmin, IsAdminOrAuthor, IsAdminOrReadOnly,
+                          IsModerator)
 from .serializers import (AuthUserSignUpSerializer, AuthUserTokenSerializer,
-                          CategorySerializer, CommentSerializer,
-                          GenreSerializer, ReviewSerializer, TitleSerializer,
-                          UserMeSerializer, UserSerializer)
-from .viewsets import CreateDestroyListModelViewSet, CreateModelViewSet
+                          CategorySerializer, ChangeSerializer,
+                          CommentSerializer, DeletionJobSerializer,
+                          GenreBulkSerializer, GenreSerializer,
+                          ModerationSerializer, ReviewBulkSerializer,
+                          ReviewSerializer, TitleBulkSerializer,
+                          TitleBulkUpdateSerializer, TitleSerializer,
+                          TitleStatsSerializer, UserCommentSerializer,
+                          UserMeSerializer, UserReviewSerializer,
+                          UserSerializer)
+from .viewsets import (CreateDestroyListModelViewSet, CreateModelViewSet,
+                       FastDestroyMixin, IdempotentCreateMixin)
+
+
+def with_comment_activity(reviews, request):
+    """Annotate reviews with their comment count and latest comment date.
+
+    The annotations are only added when the client asked for them.
+    """
+    if not ReviewSerializer.included_fields(request):
+        return reviews
+
+    visible = Q(comments__is_hidden=False)
 
+    return reviews.annotate(
+        comment_count=Count("comments", filter=visible),
+        last_comment_at=Max("comments__pub_date", filter=visible),
+    )
 
-class UserViewSet(viewsets.ModelViewSet):
+
+class UserViewSet(FastDestroyMixin, viewsets.ModelViewSet):
     permission_classes = (IsAdmin,)
     pagination_class = LimitOffsetPagination
     queryset = User.objects.all()
@@ -26,6 +66,51 @@ class UserViewSet(viewsets.ModelViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("username",)
     lookup_field = "username"
+    deletion_target = "user"
+
+    def get_activity_page(self, queryset, serializer_class):
+        page = self.paginate_queryset(queryset)
+
+        return self.get_paginated_response(
+            serializer_class(
+                page, many=True, context=self.get_serializer_context()
+            ).data
+        )
+
+    @action(
+        detail=True,
+        permission_classes=(permissions.AllowAny,),
+        pagination_class=PubDateCursorPagination,
+    )
+    def reviews(self, request, username=None):
+        author = get_object_or_404(User, username=username)
+
+        return self.get_activity_page(
+            with_comment_activity(
+                Review.objects.filter(
+                    author=author, is_hidden=False
+                ).select_related(
+                    "author", "title"
+                ),
+                request,
+            ),
+            UserReviewSerializer,
+        )
+
+    @action(
+        detail=True,
+        permission_classes=(permissions.AllowAny,),
+        pagination_class=PubDateCursorPagination,
+    )
+    def comments(self, request, username=None):
+        author = get_object_or_404(User, username=username)
+
+        return self.get_activity_page(
+            Comment.objects.filter(
+                author=author, is_hidden=False, review__is_hidden=False
+            ).select_related("author", "review__title"),
+            UserCommentSerializer,
+        )
 
 
 class UserMeView(views.APIView):
@@ -43,13 +128,51 @@ class UserMeView(views.APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(FastDestroyMixin, viewsets.ModelViewSet):
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = Title.objects.all()
+    queryset = Title.objects.select_related("stats").prefetch_related(
+        Prefetch("genre", queryset=Genre.objects.only("id"))
+    )
     serializer_class = TitleSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     pagination_class = LimitOffsetPagination
+    deletion_target = "title"
+
+    @action(detail=False, methods=("post", "patch"), url_path="bulk")
+    def bulk(self, request):
+        if request.method == "POST":
+            serializer = TitleBulkSerializer(data=request.data, many=True)
+            response_status = status.HTTP_201_CREATED
+        else:
+            serializer = TitleBulkUpdateSerializer(
+                Title.objects.all(),
+                data=request.data,
+                many=True,
+                partial=True,
+            )
+            response_status = status.HTTP_200_OK
+
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+
+        titles = self.get_queryset().filter(
+            pk__in=[title.pk for title in titles]
+        )
+
+        return Response(
+            TitleSerializer(
+                titles, many=True, context=self.get_serializer_context()
+            ).data,
+            status=response_status,
+        )
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        title = self.get_object()
+        attach_missing_stats([title])
+
+        return Response(TitleStatsSerializer(title.stats).data)
 
 
 class GenreViewSet(CreateDestroyListModelViewSet):
@@ -60,6 +183,14 @@ class GenreViewSet(CreateDestroyListModelViewSet):
     search_fields = ("name",)
     lookup_field = "slug"
 
+    @action(detail=False, methods=("post",), url_path="bulk")
+    def bulk(self, request):
+        serializer = GenreBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 class CategoryViewSet(CreateDestroyListModelViewSet):
     permission_classes = (IsAdminOrReadOnly,)
@@ -70,7 +201,7 @@ class CategoryViewSet(CreateDestroyListModelViewSet):
     lookup_field = "slug"
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     permission_classes = (IsAdminOrAuthor,)
     serializer_class = ReviewSerializer
@@ -79,27 +210,53 @@ class ReviewViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
 
-        return title.reviews.all()
+        return with_comment_activity(
+            title.reviews.filter(is_hidden=False).select_related("author"),
+            self.request,
+        )
 
     def perform_create(self, serializer):
         title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
 
         serializer.save(author=self.request.user, title=title)
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            delete_reviews(Review.objects.filter(pk=instance.pk))
+
+    @action(
+        detail=False,
+        methods=("post",),
+        url_path="bulk",
+        permission_classes=(IsAdmin,),
+    )
+    def bulk(self, request, title_id=None):
+        title = get_object_or_404(Title, pk=title_id)
+        serializer = ReviewBulkSerializer(
+            data=request.data, many=True, context={"title": title}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     permission_classes = (IsAdminOrAuthor,)
     serializer_class = CommentSerializer
     pagination_class = LimitOffsetPagination
 
-    def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
+    def get_review(self):
+        return get_object_or_404(
+            Review, pk=self.kwargs.get("review_id"), is_hidden=False
+        )
 
-        return review.comments.all()
+    def get_queryset(self):
+        return self.get_review().comments.filter(is_hidden=False)
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
+        review = self.get_review()
 
         serializer.save(author=self.request.user, review=review)
 
@@ -139,9 +296,11 @@ class AuthSignUpViewSet(CreateModelViewSet):
             user = User.objects.get(**user_filter_params)
             user.confirmation_code = confirmation_code
             user.save()
+            metrics.AUTH_SIGNUPS.inc(result="resent")
         else:
             serializer.is_valid(raise_exception=True)
             serializer.save(confirmation_code=confirmation_code)
+            metrics.AUTH_SIGNUPS.inc(result="created")
 
         self.send_confirmation_code(
             serializer.initial_data["email"], confirmation_code
@@ -156,3 +315,127 @@ class AuthSignUpViewSet(CreateModelViewSet):
 
 class AuthTokenViewSet(TokenObtainPairView):
     serializer_class = AuthUserTokenSerializer
+
+    def post(self, request, *args, **kwargs):
+        try:
+            response = super().post(request, *args, **kwargs)
+        except (exceptions.APIException, Http404):
+            metrics.AUTH_TOKENS.inc(result="rejected")
+            raise
+
+        metrics.AUTH_TOKENS.inc(
+            result="issued" if response.status_code == 200 else "rejected"
+        )
+
+        return response
+
+
+class ExportView(views.APIView):
+    permission_classes = (IsAdmin,)
+    content_types = {
+        "csv": "text/csv; charset=utf-8",
+        "ndjson": "application/x-ndjson; charset=utf-8",
+    }
+
+    def get(self, request, table):
+        export_format = request.query_params.get("type", "csv")
+
+        if table not in EXPORT_TABLES or export_format not in EXPORT_FORMATS:
+            raise Http404
+
+        response = StreamingHttpResponse(
+            stream_table(table, export_format),
+            content_type=self.content_types[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{table}.{export_format}"'
+        )
+
+        return response
+
+
+class ChangeFeedView(views.APIView):
+    """Change log of titles, reviews and comments after a cursor.
+
+    Ids are taken when an entry is inserted but become visible when its
+    transaction commits, so a lower id may show up after a higher one.
+    Entries are therefore only served once older than
+    CHANGES_SETTLE_SECONDS, and never past the first unsettled one, so the
+    cursor never moves over an entry that is still being committed. The
+    window must exceed the longest transaction that writes the log.
+    """
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get("since", 0))
+            limit = int(
+                request.query_params.get("limit", settings.CHANGES_PAGE_SIZE)
+            )
+        except ValueError:
+            raise exceptions.ValidationError(
+                "Параметры since и limit должны быть целыми числами."
+            )
+
+        limit = max(1, min(limit, settings.CHANGES_PAGE_SIZE))
+        changes = Change.objects.filter(id__gt=since)
+        settled = timezone.now() - timedelta(
+            seconds=settings.CHANGES_SETTLE_SECONDS
+        )
+        unsettled = (
+            changes.filter(created__gte=settled)
+            .order_by("id")
+            .values_list("id", flat=True)
+            .first()
+        )
+
+        if unsettled is not None:
+            changes = changes.filter(id__lt=unsettled)
+        tables = request.query_params.get("table")
+
+        if tables:
+            changes = changes.filter(table__in=tables.split(","))
+
+        changes = list(changes[: limit + 1])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        return Response(
+            {
+                "next": changes[-1].pk if changes else since,
+                "has_more": has_more,
+                "results": ChangeSerializer(changes, many=True).data,
+            }
+        )
+
+
+class DeletionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    permission_classes = (IsAdmin,)
+    queryset = DeletionJob.objects.all()
+    serializer_class = DeletionJobSerializer
+    pagination_class = LimitOffsetPagination
+
+
+class ModerationView(views.APIView):
+    """Delete, hide or show many reviews or comments at once.
+
+    Moderators act on any rows; other users may only delete their own.
+    """
+
+    def post(self, request, target):
+        if target not in MODERATION_TARGETS:
+            raise Http404
+
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action = serializer.validated_data["action"]
+        queryset = serializer.get_queryset(target)
+
+        if not IsModerator().has_permission(request, self):
+            if action != "delete":
+                raise exceptions.PermissionDenied()
+
+            queryset = queryset.filter(author=request.user)
+
+        return Response(
+            {"action": action, **moderate(target, action, queryset)}
+        )
@@ -1,4 +1,19 @@
-from rest_framework import mixins, viewsets
+import json
+from datetime import timedelta
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import exceptions, mixins, status, viewsets
+from rest_framework.response import Response
+from reviews.deletion import (count_dependents, delete_object,
+                              start_deletion_job, unfinished_jobs)
+from reviews.inserts import insert_ignoring_conflicts
+from reviews.models import IdempotencyKey
+
+from .serializers import DeletionJobSerializer
 
 
 class CreateDestroyListModelViewSet(
@@ -12,3 +27,115 @@ class CreateDestroyListModelViewSet(
 
 class CreateModelViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     pass
+
+
+class FastDestroyMixin:
+    """Deletes the object with its reviews and comments using set-based SQL.
+
+    When more than DELETION_ASYNC_THRESHOLD reviews and comments depend on
+    the object, a background job is queued instead and returned with 202;
+    requests made while it runs get the same job.
+    """
+
+    deletion_target = None
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        # A retry while a job is deleting the object gets that job back.
+        if (
+            not unfinished_jobs(self.deletion_target, instance.pk).exists()
+            and count_dependents(self.deletion_target, instance.pk)
+            <= settings.DELETION_ASYNC_THRESHOLD
+        ):
+            delete_object(self.deletion_target, instance.pk)
+
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        job = start_deletion_job(self.deletion_target, instance.pk)
+
+        return Response(
+            DeletionJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class IdempotentCreateMixin:
+    """Replays the response of a create retried with the same key.
+
+    A client sends a unique Idempotency-Key header with a POST. The key is
+    claimed with a conflict-aware insert in the transaction of the create,
+    so a concurrent retry waits for the first request and then gets its
+    response instead of creating the object again. Keys expire after
+    IDEMPOTENCY_KEY_TTL_HOURS and are deleted by purge_idempotency_keys;
+    failed requests do not use up the key.
+    """
+
+    def fingerprint(self, request):
+        payload = json.dumps(
+            request.data, sort_keys=True, cls=DjangoJSONEncoder
+        )
+
+        return sha256(f"{request.path}\n{payload}".encode()).hexdigest()
+
+    def claim_key(self, request, key, fingerprint):
+        """Stored response for the key, or None once it is claimed."""
+        if insert_ignoring_conflicts(
+            IdempotencyKey(user=request.user, key=key, fingerprint=fingerprint)
+        ):
+            return None
+
+        stored = IdempotencyKey.objects.select_for_update().get(
+            user=request.user, key=key
+        )
+        expires = stored.created + timedelta(
+            hours=settings.IDEMPOTENCY_KEY_TTL_HOURS
+        )
+
+        if expires <= timezone.now():
+            stored.fingerprint = fingerprint
+            stored.status_code = None
+            stored.response = ""
+            stored.created = timezone.now()
+            stored.save()
+
+            return None
+
+        if stored.fingerprint != fingerprint:
+            raise exceptions.ValidationError(
+                "Ключ идемпотентности уже использован для другого запроса."
+            )
+
+        return stored
+
+    def create(self, request, *args, **kwargs):
+        key = request.META.get("HTTP_IDEMPOTENCY_KEY")
+
+        if not key:
+            return super().create(request, *args, **kwargs)
+
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            raise exceptions.ValidationError(
+                "Ключ идемпотентности слишком длинный."
+            )
+
+        fingerprint = self.fingerprint(request)
+
+        with transaction.atomic():
+            stored = self.claim_key(request, key, fingerprint)
+
+            if stored is not None:
+                response = Response(
+                    json.loads(stored.response), status=stored.status_code
+                )
+                response["Idempotent-Replayed"] = "true"
+
+                return response
+
+            response = super().create(request, *args, **kwargs)
+            IdempotencyKey.objects.filter(user=request.user, key=key).update(
+                status_code=response.status_code,
+                response=json.dumps(response.data, cls=DjangoJSONEncoder),
+            )
+
+        return response
@@ -0,0 +1,293 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Metrics live in module-level objects and are updated in place. Each one
+holds its own lock for a few dict operations only. With METRICS_DIR set,
+every process (gunicorn worker or management command) periodically writes
+a snapshot of its metrics to ``METRICS_DIR/<pid>.<random>.json``. The
+/metrics view then sums the snapshots of all processes.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from glob import glob
+from uuid import uuid4
+
+from django.conf import settings
+from reviews.cache import SLUG_CACHES
+
+REGISTRY = {}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Called at collection time instead of keeping values here, for
+        # counts maintained elsewhere. Returns {label values: value}.
+        self.collect = collect
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY[name] = self
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def state(self):
+        """Values by label values, as JSON-serializable pairs."""
+        if self.collect is not None:
+            values = self.collect()
+        else:
+            with self.lock:
+                values = {
+                    key: list(value) if isinstance(value, list) else value
+                    for key, value in self.values.items()
+                }
+
+        return [[list(key), value] for key, value in values.items()]
+
+    @staticmethod
+    def merge(first, second):
+        return first + second
+
+    def labels(self, key, **extra):
+        pairs = list(zip(self.labelnames, key)) + list(extra.items())
+
+        if not pairs:
+            return ""
+
+        return "{%s}" % ",".join(
+            '%s="%s"' % (name, escape(value)) for name, value in pairs
+        )
+
+    def render(self, state):
+        for key, value in state:
+            yield f"{self.name}{self.labels(key)} {value}"
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets=LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        # Per-bucket (not cumulative) counts, the +Inf bucket, then the sum.
+        index = bisect_left(self.buckets, value)
+
+        with self.lock:
+            counts = self.values.get(key)
+
+            if counts is None:
+                counts = self.values[key] = [0] * (len(self.buckets) + 2)
+
+            counts[index] += 1
+            counts[-1] += value
+
+    @staticmethod
+    def merge(first, second):
+        return [a + b for a, b in zip(first, second)]
+
+    def render(self, state):
+        for key, counts in state:
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield "%s_bucket%s %s" % (
+                    self.name,
+                    self.labels(key, le=bound),
+                    cumulative,
+                )
+
+            yield f"{self.name}_sum{self.labels(key)} {counts[-1]}"
+            yield f"{self.name}_count{self.labels(key)} {cumulative}"
+
+
+def snapshot():
+    return {name: metric.state() for name, metric in REGISTRY.items()}
+
+
+_last_flush = 0
+_snapshot_name = None
+_snapshot_pid = None
+
+
+def snapshot_name():
+    """File name of this process's snapshot.
+
+    A random part keeps a worker with a recycled pid from overwriting the
+    snapshot of a dead one; it is chosen again after a fork.
+    """
+    global _snapshot_name, _snapshot_pid
+
+    if _snapshot_pid != os.getpid():
+        _snapshot_pid = os.getpid()
+        _snapshot_name = f"{_snapshot_pid}.{uuid4().hex[:12]}.json"
+
+    return _snapshot_name
+
+
+def flush(force=False):
+    """Write this process's snapshot when in multiprocess mode.
+
+    Unless forced, snapshots are written at most every METRICS_FLUSH_SECONDS.
+    """
+    global _last_flush
+
+    if not settings.METRICS_DIR:
+        return
+
+    now = time.monotonic()
+
+    if not force and now - _last_flush < settings.METRICS_FLUSH_SECONDS:
+        return
+
+    _last_flush = now
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    path = os.path.join(settings.METRICS_DIR, snapshot_name())
+
+    with open(path + ".tmp", "w") as snapshot_file:
+        json.dump(snapshot(), snapshot_file)
+
+    os.replace(path + ".tmp", path)
+
+
+atexit.register(flush, force=True)
+
+
+def collect():
+    """Metric states of this process, or summed over all processes."""
+    if not settings.METRICS_DIR:
+        return snapshot()
+
+    flush(force=True)
+    merged = {}
+
+    for path in glob(os.path.join(settings.METRICS_DIR, "*.json")):
+        try:
+            with open(path) as snapshot_file:
+                states = json.load(snapshot_file)
+        except (OSError, ValueError):
+            continue
+
+        for name, state in states.items():
+            metric = REGISTRY.get(name)
+
+            if metric is None:
+                continue
+
+            values = merged.setdefault(name, {})
+
+            for key, value in state:
+                key = tuple(key)
+                values[key] = (
+                    metric.merge(values[key], value)
+                    if key in values
+                    else value
+                )
+
+    return {
+        name: [[list(key), value] for key, value in values.items()]
+        for name, values in merged.items()
+    }
+
+
+def render():
+    """All metrics in the text exposition format."""
+    lines = []
+
+    for name, state in sorted(collect().items()):
+        metric = REGISTRY[name]
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.type}")
+        lines.extend(metric.render(sorted(state)))
+
+    return "\n".join(lines) + "\n"
+
+
+def _slug_cache_counts(attribute):
+    def collect():
+        return {
+            (cache.model._meta.model_name,): getattr(cache, attribute)
+            for cache in SLUG_CACHES
+        }
+
+    return collect
+
+
+HTTP_REQUESTS = Counter(
+    "yamdb_http_requests_total",
+    "HTTP requests by route, method and status.",
+    ("route", "method", "status"),
+)
+HTTP_LATENCY = Histogram(
+    "yamdb_http_request_duration_seconds",
+    "HTTP request latency by route and method.",
+    ("route", "method"),
+)
+DB_QUERIES = Counter(
+    "yamdb_db_queries_total",
+    "Database queries run by requests, by route.",
+    ("route",),
+)
+SLUG_CACHE_HITS = Counter(
+    "yamdb_slug_cache_hits_total",
+    "Genre and category slug lookups served from the process cache.",
+    ("cache",),
+    collect=_slug_cache_counts("hits"),
+)
+SLUG_CACHE_MISSES = Counter(
+    "yamdb_slug_cache_misses_total",
+    "Genre and category slug lookups that queried the database.",
+    ("cache",),
+    collect=_slug_cache_counts("misses"),
+)
+AUTH_SIGNUPS = Counter(
+    "yamdb_auth_signups_total",
+    "Sign-ups, by new users and confirmation codes sent again.",
+    ("result",),
+)
+AUTH_TOKENS = Counter(
+    "yamdb_auth_tokens_total",
+    "Token requests, by issued and rejected.",
+    ("result",),
+)
+IMPORT_ROWS = Counter(
+    "yamdb_import_rows_total",
+    "Rows imported by import_csv, by table.",
+    ("table",),
+)
+IMPORT_SECONDS = Counter(
+    "yamdb_import_seconds_total",
+    "Time spent importing rows by import_csv, by table.",
+    ("table",),
+)
@@ -0,0 +1,165 @@
+import cProfile
+import random
+import time
+from contextlib import ExitStack
+from hashlib import sha1
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import metrics
+from .profiling import save_profile
+from .routers import read_from_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReplicaRoutingMiddleware:
+    """Lets safe requests read from replicas, with read-your-writes.
+
+    After an unsafe request the client (identified by its Authorization
+    header) keeps reading from the primary for REPLICA_STICKY_SECONDS, until
+    the replicas have caught up. Anonymous writes (sign-up and token
+    requests) write nothing the client reads back, and behind a proxy all
+    anonymous clients share one address, so they are not made sticky.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def sticky_key(request):
+        """Cache key of an authenticated client, None for anonymous ones."""
+        client = request.META.get("HTTP_AUTHORIZATION")
+
+        if not client:
+            return None
+
+        return "replica-sticky:" + sha1(client.encode()).hexdigest()
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        shared_cache = caches[settings.REPLICA_STICKY_CACHE_ALIAS]
+        key = self.sticky_key(request)
+        is_write = request.method not in SAFE_METHODS
+        token = read_from_primary.set(
+            is_write or key is not None and shared_cache.get(key) is not None
+        )
+
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_primary.reset(token)
+
+        if is_write and key is not None:
+            shared_cache.set(key, 1, timeout=settings.REPLICA_STICKY_SECONDS)
+
+        return response
+
+
+class ProfilingMiddleware:
+    """Profiles requests with cProfile and dumps the stats of each one.
+
+    A request is kept when an admin sent the X-Profile header, when it was
+    sampled at PROFILING_SAMPLE_RATE, or when it took PROFILING_SLOW_MS or
+    longer. The latency threshold means every request runs under the
+    profiler, so it is meant for short investigations.
+
+    The X-Profile header is honoured only with a valid token of an admin,
+    checked here before the view runs, so other clients cannot make their
+    requests run under the profiler.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    @staticmethod
+    def is_admin(request):
+        """Whether the request carries a valid access token of an admin."""
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except APIException:
+            return False
+
+        if authenticated is None:
+            return False
+
+        user, _ = authenticated
+
+        return user.role == "admin" or user.is_staff
+
+    def __call__(self, request):
+        requested = "HTTP_X_PROFILE" in request.META and self.is_admin(request)
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+
+        if not (requested or sampled or settings.PROFILING_SLOW_MS):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        slow = (
+            settings.PROFILING_SLOW_MS
+            and elapsed_ms >= settings.PROFILING_SLOW_MS
+        )
+
+        if requested or sampled or slow:
+            match = request.resolver_match
+            view_name = match.view_name if match else "unresolved"
+            save_profile(profiler, view_name, elapsed_ms)
+
+        return response
+
+
+class MetricsMiddleware:
+    """Counts requests, their latency and database queries per route."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+
+            response = self.get_response(request)
+
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        route = match.view_name if match else "unresolved"
+        metrics.HTTP_REQUESTS.inc(
+            route=route, method=request.method, status=response.status_code
+        )
+        metrics.HTTP_LATENCY.observe(
+            elapsed, route=route, method=request.method
+        )
+        metrics.DB_QUERIES.inc(queries, route=route)
+        metrics.flush()
+
+        return response
@@ -0,0 +1,62 @@
+"""cProfile dumps of single requests, kept in a rotating directory.
+
+Dumps are named ``<ms timestamp>.<pid>.<view name>.<elapsed>ms.prof`` so
+that they sort by time and can be grouped by view without being loaded.
+"""
+import os
+import re
+import time
+from contextlib import suppress
+from glob import glob
+
+from django.conf import settings
+
+DUMP_NAME = re.compile(
+    r"^\d+\.\d+\.(?P<view_name>[\w-]+)\.(?P<elapsed>\d+)ms\.prof$"
+)
+
+
+def dump_name(view_name, elapsed_ms):
+    view_name = re.sub(r"[^\w-]", "_", view_name)
+
+    return "%d.%d.%s.%dms.prof" % (
+        time.time() * 1000,
+        os.getpid(),
+        view_name,
+        elapsed_ms,
+    )
+
+
+def parse_dump_name(path):
+    """View name and elapsed milliseconds of a dump, None for other files."""
+    match = DUMP_NAME.match(os.path.basename(path))
+
+    if match is None:
+        return None
+
+    return match.group("view_name"), int(match.group("elapsed"))
+
+
+def list_dumps(directory=None):
+    """Dump paths, oldest first; other files in the directory are ignored."""
+    directory = directory or settings.PROFILING_DIR
+
+    return sorted(
+        path
+        for path in glob(os.path.join(directory, "*.prof"))
+        if parse_dump_name(path) is not None
+    )
+
+
+def save_profile(profiler, view_name, elapsed_ms):
+    """Write a dump and drop the oldest ones beyond PROFILING_MAX_DUMPS."""
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    profiler.dump_stats(
+        os.path.join(settings.PROFILING_DIR, dump_name(view_name, elapsed_ms))
+    )
+    dumps = list_dumps()
+
+    for path in dumps[: len(dumps) - settings.PROFILING_MAX_DUMPS]:
+        # Another worker may be rotating the same directory.
+        with suppress(FileNotFoundError):
+            os.remove(path)
@@ -0,0 +1,36 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Reads go to the primary unless a request explicitly allows replicas, so
+# management commands and background threads always see their own writes.
+read_from_primary = ContextVar("read_from_primary", default=True)
+
+
+class ReplicaRouter:
+    """Sends reads to a random replica from settings.DATABASE_REPLICAS.
+
+    Writes, reads inside a transaction and reads outside of a replica-safe
+    request (see ReplicaRoutingMiddleware) use the primary database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            not settings.DATABASE_REPLICAS
+            or read_from_primary.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
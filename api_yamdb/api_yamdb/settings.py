@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -23,7 +24,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api_yamdb.middleware.MetricsMiddleware",
+    "api_yamdb.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "api_yamdb.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -64,6 +68,50 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Shared by all gunicorn workers; point it at memcached or redis when the
+    # workers run on several hosts.
+    "shared": {
+        "BACKEND": os.getenv(
+            "SHARED_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv(
+            "SHARED_CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "yamdb_cache"),
+        ),
+    },
+}
+
+# Read replicas: comma-separated hosts (and/or database names, e.g. SQLite
+# files), one replica per position. Unset means a single database.
+DB_REPLICA_HOSTS = [host for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host]
+DB_REPLICA_NAMES = [name for name in os.getenv("DB_REPLICA_NAMES", "").split(",") if name]
+DATABASE_REPLICAS = []
+
+for index in range(max(len(DB_REPLICA_HOSTS), len(DB_REPLICA_NAMES))):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+    if index < len(DB_REPLICA_HOSTS):
+        DATABASES[alias]["HOST"] = DB_REPLICA_HOSTS[index]
+
+    if index < len(DB_REPLICA_NAMES):
+        DATABASES[alias]["NAME"] = DB_REPLICA_NAMES[index]
+
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["api_yamdb.routers.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+# Cache shared by all workers that remembers clients reading from the primary.
+REPLICA_STICKY_CACHE_ALIAS = "shared"
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -116,3 +164,52 @@ SIMPLE_JWT = {
 
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+EXPORT_CHUNK_SIZE = 2000
+
+CHANGES_PAGE_SIZE = 500
+# Longer than any transaction writing the change log, see ChangeFeedView.
+CHANGES_SETTLE_SECONDS = int(os.getenv("CHANGES_SETTLE_SECONDS", 30))
+CHANGES_COMPACT_AFTER_DAYS = int(os.getenv("CHANGES_COMPACT_AFTER_DAYS", 1))
+CHANGES_RETENTION_DAYS = int(os.getenv("CHANGES_RETENTION_DAYS", 0))
+
+# Largest batch accepted by the bulk endpoints.
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 500))
+
+DELETION_CHUNK_SIZE = 1000
+DELETION_ASYNC_THRESHOLD = int(os.getenv("DELETION_ASYNC_THRESHOLD", 5000))
+# A running job whose runner has not reported for this long is taken over.
+DELETION_JOB_LEASE_SECONDS = int(
+    os.getenv("DELETION_JOB_LEASE_SECONDS", 300)
+)
+
+# Admin changelists of larger tables show the planner's row estimate.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+SLUG_CACHE_ALIAS = "shared"
+SLUG_CACHE_SIZE = 1024
+# How stale another worker's genre and category changes may be seen.
+SLUG_CACHE_SYNC_SECONDS = int(os.getenv("SLUG_CACHE_SYNC_SECONDS", 1))
+
+# Request profiling, see api_yamdb.middleware.ProfilingMiddleware.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_SLOW_MS = int(os.getenv("PROFILING_SLOW_MS", 0))
+PROFILING_DIR = os.getenv(
+    "PROFILING_DIR", os.path.join(tempfile.gettempdir(), "yamdb_profiles")
+)
+# At least the dump just written is kept.
+PROFILING_MAX_DUMPS = max(int(os.getenv("PROFILING_MAX_DUMPS", 500)), 1)
+
+# Metrics, see api_yamdb.metrics. Set METRICS_DIR to aggregate the metrics
+# of all gunicorn workers. /metrics answers clients from METRICS_ALLOWED_IPS
+# (local ones by default) and scrapers sending METRICS_TOKEN.
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = int(os.getenv("METRICS_FLUSH_SECONDS", 5))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = [
+    ip
+    for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+    if ip
+]
@@ -0,0 +1,46 @@
+"""Settings of API-only workers.
+
+Clients authenticate with JWT, so these workers need neither the admin nor
+sessions and messages. Leaving them out removes their middleware from every
+request and skips loading the admin site and the admin modules of the apps.
+It barely changes import time: DRF imports django.contrib.admin anyway, via
+rest_framework.schemas and django.contrib.admindocs. Use the main settings
+for the admin and manage.py.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+ADMIN_APPS = (
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+)
+ADMIN_MIDDLEWARE = (
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_APPS]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in ADMIN_MIDDLEWARE
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
+}
@@ -1,13 +1,20 @@
-from django.contrib import admin
+from django.apps import apps
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from .views import metrics_view
+
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/v1/", include("api.urls")),
     path(
         "redoc/",
         TemplateView.as_view(template_name="redoc.html"),
         name="redoc",
     ),
+    path("metrics", metrics_view, name="metrics"),
 ]
+
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.append(path("admin/", admin.site.urls))
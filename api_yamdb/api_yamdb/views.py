@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from . import metrics
+
+
+def metrics_view(request):
+    """Metrics of this process, or of all of them, for Prometheus.
+
+    Served to clients from METRICS_ALLOWED_IPS and, when METRICS_TOKEN is
+    set, to any client sending it as a bearer token.
+    """
+    allowed = request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+    if settings.METRICS_TOKEN:
+        allowed = allowed or request.META.get(
+            "HTTP_AUTHORIZATION"
+        ) == f"Bearer {settings.METRICS_TOKEN}"
+
+    if not allowed:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        metrics.render(), content_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,26 @@
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 1))
+
+# Import Django and the project once in the master and fork the workers from
+# it, so a new worker is ready without importing anything. Connections to
+# the database and caches are opened lazily, in each worker.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+
+def on_starting(server):
+    """Start aggregated metrics (see api_yamdb.metrics) from zero."""
+    metrics_dir = os.getenv("METRICS_DIR")
+
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def when_ready(server):
+    """Load the URLconf, and with it the views, before forking workers."""
+    if preload_app:
+        from django.urls import get_resolver
+
+        get_resolver().url_patterns
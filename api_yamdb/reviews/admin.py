@@ -1,10 +1,85 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 
 from .models import Category, Comment, Genre, Review, Title, User
 
-admin.site.register(Category)
-admin.site.register(Comment)
-admin.site.register(Genre)
-admin.site.register(Review)
-admin.site.register(Title)
-admin.site.register(User)
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator using the PostgreSQL row estimate for large tables.
+
+    An unfiltered changelist of a table with at least
+    ADMIN_ESTIMATED_COUNT_THRESHOLD rows is counted from pg_class instead
+    of a full COUNT(*); filtered ones and smaller tables are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+
+            if row and row[0] >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered COUNT(*) next to filtered results.
+    show_full_result_count = False
+    ordering = ("-id",)
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "slug")
+    search_fields = ("name", "slug")
+
+
+@admin.register(Genre)
+class GenreAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "slug")
+    search_fields = ("name", "slug")
+
+
+@admin.register(Title)
+class TitleAdmin(LargeTableAdmin):
+    list_display = ("id", "name", "year", "category")
+    list_select_related = ("category",)
+    list_filter = ("year", "category")
+    autocomplete_fields = ("category", "genre")
+
+
+@admin.register(Review)
+class ReviewAdmin(LargeTableAdmin):
+    list_display = ("id", "title", "author", "score", "pub_date", "is_hidden")
+    list_select_related = ("title", "author")
+    list_filter = ("is_hidden",)
+    raw_id_fields = ("title", "author")
+    search_fields = ("=author__username",)
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ("id", "review", "author", "pub_date", "is_hidden")
+    list_select_related = ("review", "author")
+    list_filter = ("is_hidden",)
+    raw_id_fields = ("review", "author")
+    search_fields = ("=author__username",)
+
+
+@admin.register(User)
+class UserAdmin(LargeTableAdmin):
+    list_display = ("id", "username", "email", "role", "is_staff")
+    search_fields = ("=username", "=email")
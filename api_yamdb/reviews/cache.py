@@ -0,0 +1,154 @@
+"""Process-local cache of genres and categories addressed by slug.
+
+Genres and categories are tiny, hot and rarely change, so every worker keeps
+a bounded LRU of ``slug -> (id, slug, name)``. Writes in any worker replace a
+version stamp in the shared cache (``SLUG_CACHE_ALIAS``) after commit, and
+each worker compares its stamp before a lookup, at most every
+``SLUG_CACHE_SYNC_SECONDS``, dropping its entries when another process has
+changed the data.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router, transaction
+
+from .models import Category, Genre
+
+CachedSlug = namedtuple("CachedSlug", ("id", "slug", "name"))
+
+
+class SlugCache:
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f"slug-cache:{model._meta.label_lower}"
+        self.version = None
+        self.synced_at = None
+        self.by_slug = OrderedDict()
+        self.by_id = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are deep-copied per instance; the cache is shared.
+        return self
+
+    @property
+    def shared(self):
+        return caches[settings.SLUG_CACHE_ALIAS]
+
+    def _clear(self):
+        self.by_slug.clear()
+        self.by_id.clear()
+
+    def sync(self):
+        """Drop local entries if another process changed the data."""
+        now = time.monotonic()
+
+        if (
+            self.synced_at is not None
+            and now - self.synced_at < settings.SLUG_CACHE_SYNC_SECONDS
+        ):
+            return
+
+        self.synced_at = now
+        version = self.shared.get(self.version_key)
+
+        if version != self.version:
+            with self.lock:
+                self._clear()
+                self.version = version
+
+    def invalidate(self):
+        with self.lock:
+            self._clear()
+
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self):
+        version = uuid4().hex
+        self.shared.set(self.version_key, version, timeout=None)
+
+        with self.lock:
+            self._clear()
+            self.version = version
+
+    def _store(self, entry):
+        self.by_slug[entry.slug] = entry
+        self.by_id[entry.id] = entry
+
+        while len(self.by_slug) > settings.SLUG_CACHE_SIZE:
+            _, evicted = self.by_slug.popitem(last=False)
+            self.by_id.pop(evicted.id, None)
+
+    def _load(self, rows):
+        rows = list(rows)
+
+        with self.lock:
+            for row in rows:
+                self._store(CachedSlug(*row))
+
+    def rows(self):
+        # Always the primary: an entry loaded from a lagging replica would
+        # be kept until the next change, pointing at renamed or deleted rows.
+        return self.model.objects.using(
+            router.db_for_write(self.model)
+        ).values_list("id", "slug", "name")
+
+    def get_many(self, values, field="slug"):
+        """Map slugs (or ids) to cached entries, loading misses at once."""
+        self.sync()
+        index = self.by_slug if field == "slug" else self.by_id
+        rows = self.rows()
+
+        if not self.by_slug:
+            # A cold cache is warmed with as much of the table as fits.
+            self._load(rows.order_by("pk")[: settings.SLUG_CACHE_SIZE])
+
+        found = {}
+        missing = set()
+
+        with self.lock:
+            for value in values:
+                entry = index.get(value)
+
+                if entry is None:
+                    missing.add(value)
+                else:
+                    found[value] = entry
+                    self.by_slug.move_to_end(entry.slug)
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            self._load(rows.filter(**{f"{field}__in": missing}))
+
+            with self.lock:
+                for value in missing:
+                    entry = index.get(value)
+
+                    if entry is not None:
+                        found[value] = entry
+
+        return found
+
+    def get(self, value, field="slug"):
+        return self.get_many([value], field).get(value)
+
+    def instance(self, entry):
+        """Model instance built from a cached entry without a query."""
+        obj = self.model(id=entry.id, slug=entry.slug, name=entry.name)
+        obj._state.adding = False
+
+        return obj
+
+
+genre_cache = SlugCache(Genre)
+category_cache = SlugCache(Category)
+
+SLUG_CACHES = (genre_cache, category_cache)
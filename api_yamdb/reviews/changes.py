@@ -0,0 +1,46 @@
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .export import EXPORT_TABLES
+from .models import Change
+
+TRACKED_MODELS = {
+    EXPORT_TABLES[table][0]: table
+    for table, _ in Change.TABLE_CHOICES
+}
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def serialize(obj):
+    """Row of a tracked object in the export (import_csv) column layout."""
+    _, columns = EXPORT_TABLES[TRACKED_MODELS[type(obj)]]
+
+    return encoder.encode(
+        {column: getattr(obj, field) for column, field in columns}
+    )
+
+
+def record_changes(objs, action):
+    """Append change-log entries for tracked objects with one insert."""
+    Change.objects.bulk_create(
+        Change(
+            table=TRACKED_MODELS[type(obj)],
+            object_id=obj.pk,
+            action=action,
+            data=serialize(obj),
+        )
+        for obj in objs
+    )
+
+
+def record_deletions(model, ids):
+    """Append delete entries for rows removed without loading them."""
+    Change.objects.bulk_create(
+        Change(
+            table=TRACKED_MODELS[model],
+            object_id=pk,
+            action="delete",
+            data=encoder.encode({"id": pk}),
+        )
+        for pk in ids
+    )
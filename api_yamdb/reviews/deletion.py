@@ -0,0 +1,257 @@
+"""Set-based deletion of users, titles, reviews and comments.
+
+Django's cascade collector loads every dependent row (and sends a signal for
+each) before deleting. The functions below instead walk the dependents in
+chunks of primary keys and remove each chunk with a single DELETE, recording
+the change log and refreshing title stats per chunk. Every chunk runs in its
+own transaction; wrap a call in ``transaction.atomic()`` to make the whole
+deletion all-or-nothing.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .changes import record_deletions
+from .inserts import insert_ignoring_conflicts
+from .models import (UNFINISHED_DELETION_STATUSES, Comment, DeletionJob,
+                     Review, Title, TitleStats, User)
+from .stats import refresh_title_stats
+
+
+def chunked_rows(queryset, fields, chunk_size):
+    """Yield rows of a queryset chunk by chunk as they are being deleted."""
+    queryset = (
+        queryset.using(router.db_for_write(queryset.model))
+        .order_by("pk")
+        .values_list(*fields)
+    )
+
+    while True:
+        rows = list(queryset[:chunk_size])
+
+        if not rows:
+            return
+
+        yield rows
+
+
+def _raw_delete(queryset):
+    # QuerySet.delete() would load every row and send post_delete for each,
+    # because reviews and comments have receivers, duplicating the change
+    # log and stats refresh done per chunk here. The private _raw_delete is
+    # the only single-statement delete Django offers, so it is kept to this
+    # helper.
+    return queryset._raw_delete(router.db_for_write(queryset.model))
+
+
+def delete_comments(queryset, chunk_size=None, progress=None):
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    deleted = 0
+
+    for rows in chunked_rows(queryset, ("pk",), chunk_size):
+        pks = [pk for pk, in rows]
+
+        with transaction.atomic():
+            record_deletions(Comment, pks)
+            deleted += _raw_delete(Comment.objects.filter(pk__in=pks))
+
+        if progress is not None:
+            progress(len(pks))
+
+    return deleted
+
+
+def delete_reviews(queryset, chunk_size=None, progress=None):
+    """Delete reviews with their comments, keeping title stats in sync."""
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    deleted = 0
+
+    for rows in chunked_rows(queryset, ("pk", "title_id"), chunk_size):
+        pks = [pk for pk, _ in rows]
+
+        with transaction.atomic():
+            deleted += delete_comments(
+                Comment.objects.filter(review_id__in=pks),
+                chunk_size,
+                progress,
+            )
+            record_deletions(Review, pks)
+            deleted += _raw_delete(Review.objects.filter(pk__in=pks))
+            refresh_title_stats(
+                {title_id for _, title_id in rows}, create_missing=False
+            )
+
+        if progress is not None:
+            progress(len(pks))
+
+    return deleted
+
+
+def delete_titles(queryset, chunk_size=None, progress=None):
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    deleted = 0
+
+    for rows in chunked_rows(queryset, ("pk",), chunk_size):
+        pks = [pk for pk, in rows]
+        deleted += delete_reviews(
+            Review.objects.filter(title_id__in=pks), chunk_size, progress
+        )
+
+        with transaction.atomic():
+            _raw_delete(Title.genre.through.objects.filter(title_id__in=pks))
+            _raw_delete(TitleStats.objects.filter(pk__in=pks))
+            record_deletions(Title, pks)
+            _raw_delete(Title.objects.filter(pk__in=pks))
+
+    return deleted
+
+
+def delete_users(queryset, chunk_size=None, progress=None):
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    deleted = 0
+
+    for rows in chunked_rows(queryset, ("pk",), chunk_size):
+        pks = [pk for pk, in rows]
+        deleted += delete_comments(
+            Comment.objects.filter(author_id__in=pks), chunk_size, progress
+        )
+        deleted += delete_reviews(
+            Review.objects.filter(author_id__in=pks), chunk_size, progress
+        )
+
+        with transaction.atomic():
+            # Reviews and comments are gone, so the collector only has the
+            # auth and admin rows of these users left to cascade.
+            User.objects.filter(pk__in=pks).delete()
+
+    return deleted
+
+
+DELETION_TARGETS = {
+    "user": (User, delete_users),
+    "title": (Title, delete_titles),
+}
+
+
+def count_dependents(target, object_id):
+    """Number of reviews and comments removed along with the object."""
+    if target == "user":
+        reviews = Review.objects.filter(author_id=object_id)
+        comments = Comment.objects.filter(
+            Q(author_id=object_id) | Q(review__author_id=object_id)
+        )
+    else:
+        reviews = Review.objects.filter(title_id=object_id)
+        comments = Comment.objects.filter(review__title_id=object_id)
+
+    return reviews.count() + comments.count()
+
+
+def delete_object(target, object_id):
+    """Delete an object and its dependents in one transaction."""
+    model, delete = DELETION_TARGETS[target]
+
+    with transaction.atomic():
+        return delete(model.objects.filter(pk=object_id))
+
+
+def expired_lease():
+    """Jobs running without a heartbeat since then have lost their runner."""
+    return timezone.now() - timedelta(
+        seconds=settings.DELETION_JOB_LEASE_SECONDS
+    )
+
+
+def claimable():
+    return Q(status__in=("pending", "failed")) | Q(status="running") & (
+        Q(heartbeat__isnull=True) | Q(heartbeat__lt=expired_lease())
+    )
+
+
+def run_deletion_job(job_id):
+    """Run a queued deletion chunk by chunk, reporting progress on the job.
+
+    A job is claimed when pending, failed or running with an expired lease;
+    the runner renews the lease with every chunk. Returns False when another
+    runner holds the job.
+    """
+    jobs = DeletionJob.objects.using(
+        router.db_for_write(DeletionJob)
+    ).filter(pk=job_id)
+
+    if not jobs.filter(claimable()).update(
+        status="running", heartbeat=timezone.now()
+    ):
+        return False
+
+    job = jobs.get()
+    model, delete = DELETION_TARGETS[job.target]
+
+    def progress(count):
+        jobs.update(deleted=F("deleted") + count, heartbeat=timezone.now())
+
+    try:
+        delete(model.objects.filter(pk=job.object_id), progress=progress)
+    except Exception as error:
+        jobs.update(status="failed", error=str(error))
+        raise
+
+    jobs.update(status="done")
+
+    return True
+
+
+def _run_in_thread(job_id):
+    try:
+        run_deletion_job(job_id)
+    finally:
+        connection.close()
+
+
+def unfinished_jobs(target, object_id):
+    return DeletionJob.objects.filter(
+        target=target,
+        object_id=object_id,
+        status__in=UNFINISHED_DELETION_STATUSES,
+    )
+
+
+def start_deletion_job(target, object_id):
+    """Queue a deletion and run it in a background thread after commit.
+
+    While a job for the object is unfinished it is returned instead of a
+    new one. Unless it is running under a live lease it is also started
+    again, which is harmless as only one runner can claim it.
+    """
+    job = DeletionJob(
+        target=target,
+        object_id=object_id,
+        total=count_dependents(target, object_id),
+    )
+
+    while not insert_ignoring_conflicts(job):
+        existing = unfinished_jobs(target, object_id).first()
+
+        # None when the conflicting job has just finished; insert again.
+        if existing is not None:
+            if (
+                existing.status == "running"
+                and existing.heartbeat is not None
+                and existing.heartbeat >= expired_lease()
+            ):
+                return existing
+
+            job = existing
+            break
+
+    transaction.on_commit(
+        lambda: threading.Thread(
+            target=_run_in_thread, args=(job.pk,), daemon=True
+        ).start()
+    )
+
+    return job
@@ -0,0 +1,121 @@
+import csv
+import datetime as dt
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Category, Comment, Genre, Review, Title, User
+
+# Table name -> (model, ((csv column, model field), ...)). Names and columns
+# match the files read by the import_csv command.
+EXPORT_TABLES = {
+    "users": (
+        User,
+        (
+            ("id", "id"),
+            ("username", "username"),
+            ("email", "email"),
+            ("role", "role"),
+            ("bio", "bio"),
+            ("first_name", "first_name"),
+            ("last_name", "last_name"),
+        ),
+    ),
+    "category": (Category, (("id", "id"), ("name", "name"), ("slug", "slug"))),
+    "genre": (Genre, (("id", "id"), ("name", "name"), ("slug", "slug"))),
+    "titles": (
+        Title,
+        (
+            ("id", "id"),
+            ("name", "name"),
+            ("year", "year"),
+            ("category", "category_id"),
+        ),
+    ),
+    "genre_title": (
+        Title.genre.through,
+        (("id", "id"), ("title_id", "title_id"), ("genre_id", "genre_id")),
+    ),
+    "review": (
+        Review,
+        (
+            ("id", "id"),
+            ("title_id", "title_id"),
+            ("text", "text"),
+            ("author", "author_id"),
+            ("score", "score"),
+            ("pub_date", "pub_date"),
+        ),
+    ),
+    "comments": (
+        Comment,
+        (
+            ("id", "id"),
+            ("review_id", "review_id"),
+            ("text", "text"),
+            ("author", "author_id"),
+            ("pub_date", "pub_date"),
+        ),
+    ),
+}
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+
+class Echo:
+    """File-like object that returns what is written instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(table, chunk_size=None):
+    """Iterate over raw rows of a table using a server-side cursor."""
+    model, columns = EXPORT_TABLES[table]
+
+    return (
+        model.objects.order_by("pk")
+        .values_list(*(field for _, field in columns))
+        .iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+    )
+
+
+def _csv_value(value):
+    if isinstance(value, dt.datetime):
+        return value.isoformat()
+
+    return value
+
+
+def stream_table(table, export_format="csv", chunk_size=None):
+    """Yield a table as CSV or NDJSON text, one chunk of rows at a time.
+
+    Memory use is bounded by the chunk size whatever the table size.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    header = [column for column, _ in EXPORT_TABLES[table][1]]
+
+    if export_format == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(header)
+
+        def render(row):
+            return writer.writerow([_csv_value(value) for value in row])
+
+    else:
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+        def render(row):
+            return encoder.encode(dict(zip(header, row))) + "\n"
+
+    lines = []
+
+    for row in export_rows(table, chunk_size):
+        lines.append(render(row))
+
+        if len(lines) >= chunk_size:
+            yield "".join(lines)
+            lines = []
+
+    if lines:
+        yield "".join(lines)
@@ -0,0 +1,30 @@
+from django.db import IntegrityError, connections, router, transaction
+
+
+def insert_ignoring_conflicts(obj):
+    """Save a new object unless a unique constraint already holds such a row.
+
+    Returns False, leaving the object unsaved, on a conflict; callers then
+    read the existing row. The insert runs in a savepoint, so a conflict
+    rolls back only the savepoint and the surrounding transaction stays
+    usable on PostgreSQL. Signals are sent as for a regular save.
+    """
+    using = router.db_for_write(type(obj), instance=obj)
+
+    try:
+        with transaction.atomic(using=using):
+            obj.save(force_insert=True, using=using)
+    except IntegrityError:
+        return False
+
+    return True
+
+
+def bulk_insert_returns_ids(model):
+    """Whether bulk_create() sets primary keys on the model's database.
+
+    PostgreSQL does; SQLite on Django 2.2 leaves them unset.
+    """
+    connection = connections[router.db_for_write(model)]
+
+    return connection.features.can_return_ids_from_bulk_insert
@@ -0,0 +1,125 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a preloaded gunicorn master does before forking workers.
+STARTUP_CODE = (
+    "from api_yamdb.wsgi import application\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def parse_import_times(output, depth):
+    """Sum `-X importtime` self times (us) by package.
+
+    Module names are cut to their first ``depth`` components, so with 3
+    django.contrib.admin and rest_framework.schemas.openapi get a line each.
+    """
+    totals = Counter()
+
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        self_time, _, name = line[len("import time:"):].split("|")
+
+        if self_time.strip().isdigit():
+            package = ".".join(name.strip().split(".")[:depth])
+            totals[package] += int(self_time)
+
+    return totals
+
+
+class Command(BaseCommand):
+    help = "Measure worker startup time and where import time is spent"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "settings_modules",
+            nargs="*",
+            default=["api_yamdb.settings", "api_yamdb.settings_api"],
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=3,
+            help="Module name components to group import times by",
+        )
+
+    def start(self, settings_module, depth):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        elapsed = time.perf_counter() - started
+
+        if process.returncode:
+            raise CommandError(
+                f"Startup with {settings_module} failed:\n{process.stderr}"
+            )
+
+        return elapsed, parse_import_times(process.stderr, depth)
+
+    def handle(self, *args, **options):
+        imported = {}
+
+        for settings_module in options["settings_modules"]:
+            runs = [
+                self.start(settings_module, options["depth"])
+                for _ in range(options["repeat"])
+            ]
+            # Imports are measured on the last run, with warm .pyc files.
+            elapsed, import_times = runs[-1]
+            imported[settings_module] = import_times
+            total = sum(import_times.values())
+
+            self.stdout.write(self.style.SUCCESS(settings_module))
+            self.stdout.write(
+                "  startup: median %.0f ms, min %.0f ms"
+                % (
+                    statistics.median(run[0] for run in runs) * 1000,
+                    min(run[0] for run in runs) * 1000,
+                )
+            )
+            self.stdout.write(
+                "  imports: %.0f ms, %d packages"
+                % (total / 1000, len(import_times))
+            )
+
+            for package, self_time in import_times.most_common(
+                options["top"]
+            ):
+                self.stdout.write(
+                    "    %8.1f ms %5.1f%%  %s"
+                    % (self_time / 1000, self_time * 100 / total, package)
+                )
+
+        baseline, *others = options["settings_modules"]
+
+        for settings_module in others:
+            skipped = imported[baseline].keys() - imported[settings_module]
+            self.stdout.write(
+                self.style.SUCCESS(f"Not imported with {settings_module}")
+            )
+
+            for package in sorted(
+                skipped, key=imported[baseline].get, reverse=True
+            )[: options["top"]]:
+                self.stdout.write(
+                    "    %8.1f ms  %s"
+                    % (imported[baseline][package] / 1000, package)
+                )
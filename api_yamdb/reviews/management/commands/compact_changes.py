@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+from reviews.models import Change
+
+
+class Command(BaseCommand):
+    help = "Compact and expire change-log entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--compact-after-days",
+            type=int,
+            default=settings.CHANGES_COMPACT_AFTER_DAYS,
+            help="Keep only the latest entry per object once it is older",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.CHANGES_RETENTION_DAYS,
+            help="Drop all entries older than this, 0 keeps them forever",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        latest = (
+            Change.objects.values("table", "object_id")
+            .annotate(last_id=Max("id"))
+            .values("last_id")
+        )
+        compacted, _ = (
+            Change.objects.filter(
+                created__lt=now
+                - timedelta(days=options["compact_after_days"])
+            )
+            .exclude(id__in=latest)
+            .delete()
+        )
+        expired = 0
+
+        if options["retention_days"]:
+            expired, _ = Change.objects.filter(
+                created__lt=now - timedelta(days=options["retention_days"])
+            ).delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compacted {compacted} and expired {expired} changes"
+            )
+        )
@@ -0,0 +1,63 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from reviews.export import EXPORT_FORMATS, EXPORT_TABLES, stream_table
+
+
+class Command(BaseCommand):
+    help = "Export DB tables as csv or ndjson in the import_csv format"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tables",
+            nargs="*",
+            help="Tables to export, all by default: %s"
+            % ", ".join(EXPORT_TABLES),
+        )
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=EXPORT_FORMATS,
+            default="csv",
+        )
+        parser.add_argument(
+            "--output",
+            default=".",
+            help='Target directory, or "-" to write to stdout',
+        )
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        tables = options["tables"] or list(EXPORT_TABLES)
+        unknown = set(tables) - set(EXPORT_TABLES)
+
+        if unknown:
+            raise CommandError("Unknown tables: %s" % ", ".join(unknown))
+
+        for table in tables:
+            chunks = stream_table(
+                table, options["export_format"], options["chunk_size"]
+            )
+
+            if options["output"] == "-":
+                for chunk in chunks:
+                    self.stdout.write(chunk, ending="")
+
+                continue
+
+            path = os.path.join(
+                options["output"], f"{table}.{options['export_format']}"
+            )
+
+            try:
+                with open(
+                    path, "w", newline="", encoding="utf-8"
+                ) as export_file:
+                    for chunk in chunks:
+                        export_file.write(chunk)
+            except OSError:
+                raise CommandError('Failed to write "%s"' % path)
+
+            self.stdout.write(
+                self.style.SUCCESS('Successfully exported "%s"' % path)
+            )
@@ -1,10 +1,14 @@
 import csv
 import os
+import time
 from typing import Dict
 
 from django.core.management.base import BaseCommand, CommandError
+from reviews.deletion import delete_titles, delete_users
 from reviews.models import Category, Comment, Genre, Review, Title, User
 
+from api_yamdb import metrics
+
 BASE_DIR = os.path.dirname(
     os.path.dirname(
         os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -28,12 +32,10 @@ class Command(BaseCommand):
 
     @staticmethod
     def clear_tables():
-        User.objects.all().delete()
+        delete_users(User.objects.all())
+        delete_titles(Title.objects.all())
         Category.objects.all().delete()
         Genre.objects.all().delete()
-        Title.objects.all().delete()
-        Review.objects.all().delete()
-        Comment.objects.all().delete()
 
     @staticmethod
     def create_row(data: Dict, name: str):
@@ -83,10 +85,13 @@ class Command(BaseCommand):
                 raise CommandError('Failed to open "%s"' % path_to_csv_file)
 
             rows = csv.DictReader(csv_file)
+            imported = 0
+            started = time.perf_counter()
 
             try:
                 for row in list(rows):
                     self.create_row(row, csv_filename)
+                    imported += 1
             except csv.Error as e:
                 raise CommandError(
                     "file {}, line {}: {}".format(
@@ -94,8 +99,13 @@ class Command(BaseCommand):
                     )
                 )
 
+            elapsed = time.perf_counter() - started
+            metrics.IMPORT_ROWS.inc(imported, table=csv_filename)
+            metrics.IMPORT_SECONDS.inc(elapsed, table=csv_filename)
+
             self.stdout.write(
                 self.style.SUCCESS(
-                    'Successfully imported "%s"' % csv_file.name
+                    'Successfully imported "%s": %d rows, %.0f rows/s'
+                    % (csv_file.name, imported, imported / (elapsed or 1))
                 )
             )
@@ -0,0 +1,68 @@
+import pstats
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_yamdb.profiling import list_dumps, parse_dump_name
+
+SORT_KEYS = {"tottime": 2, "cumtime": 3}
+
+
+class Command(BaseCommand):
+    help = "Aggregate request profiles into the hottest functions per view"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "views", nargs="*", help="View names to report, all by default"
+        )
+        parser.add_argument("--dir", default=None)
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument(
+            "--sort", choices=SORT_KEYS, default="tottime"
+        )
+
+    def handle(self, *args, **options):
+        dumps = defaultdict(list)
+
+        for path in list_dumps(options["dir"]):
+            view_name, elapsed_ms = parse_dump_name(path)
+
+            if not options["views"] or view_name in options["views"]:
+                dumps[view_name].append((path, elapsed_ms))
+
+        if not dumps:
+            raise CommandError("No profiles found")
+
+        sort_key = SORT_KEYS[options["sort"]]
+
+        for view_name, view_dumps in sorted(dumps.items()):
+            elapsed = sorted(elapsed_ms for _, elapsed_ms in view_dumps)
+            stats = pstats.Stats(*(path for path, _ in view_dumps))
+            functions = sorted(
+                stats.stats.items(),
+                key=lambda item: item[1][sort_key],
+                reverse=True,
+            )
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "%s: %d requests, median %d ms, max %d ms"
+                    % (
+                        view_name,
+                        len(elapsed),
+                        elapsed[len(elapsed) // 2],
+                        elapsed[-1],
+                    )
+                )
+            )
+            self.stdout.write(
+                "  %10s %10s %10s  function" % ("calls", "tottime", "cumtime")
+            )
+
+            for function, row in functions[: options["top"]]:
+                _, calls, tottime, cumtime, _ = row
+                name = pstats.func_std_string(function)
+                self.stdout.write(
+                    "  %10d %10.4f %10.4f  %s"
+                    % (calls, tottime, cumtime, name)
+                )
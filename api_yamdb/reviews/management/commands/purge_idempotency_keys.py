@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from reviews.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete expired idempotency keys with their stored responses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ttl-hours",
+            type=int,
+            default=settings.IDEMPOTENCY_KEY_TTL_HOURS,
+            help="Delete keys claimed longer ago than this",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        expired = IdempotencyKey.objects.filter(
+            created__lt=timezone.now() - timedelta(hours=options["ttl_hours"])
+        )
+        total = 0
+
+        # Short per-chunk deletes keep locks off keys being claimed now; the
+        # cutoff is checked again in case a key was re-claimed meanwhile.
+        while True:
+            pks = list(
+                expired.order_by("created").values_list("pk", flat=True)[
+                    : options["chunk_size"]
+                ]
+            )
+
+            if not pks:
+                break
+
+            deleted, _ = expired.filter(pk__in=pks).delete()
+            total += deleted
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Purged {total} idempotency keys")
+        )
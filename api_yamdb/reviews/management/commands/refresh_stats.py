@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from reviews.models import Title
+from reviews.stats import refresh_title_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute stored review statistics of all titles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        title_ids = Title.objects.order_by("pk").values_list("pk", flat=True)
+        chunk = []
+        total = 0
+
+        for title_id in title_ids.iterator(chunk_size=options["chunk_size"]):
+            chunk.append(title_id)
+
+            if len(chunk) >= options["chunk_size"]:
+                total += len(refresh_title_stats(chunk))
+                chunk = []
+
+        if chunk:
+            total += len(refresh_title_stats(chunk))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed stats of {total} titles")
+        )
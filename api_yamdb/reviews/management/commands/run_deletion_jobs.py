@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from reviews.deletion import claimable, run_deletion_job
+from reviews.models import DeletionJob
+
+
+class Command(BaseCommand):
+    help = "Run queued deletion jobs, e.g. ones interrupted by a restart"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Also restart failed jobs and ones whose runner has died",
+        )
+
+    def handle(self, *args, **options):
+        jobs = DeletionJob.objects.filter(
+            claimable() if options["resume"] else Q(status="pending")
+        )
+
+        for job in jobs:
+            self.stdout.write(
+                f"Deleting {job.target} {job.object_id} "
+                f"({job.total} related records)"
+            )
+
+            if run_deletion_job(job.pk):
+                job.refresh_from_db()
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Job {job.pk} done, {job.deleted} records deleted"
+                    )
+                )
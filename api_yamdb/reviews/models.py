@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -96,6 +97,56 @@ class Title(models.Model):
         verbose_name = "Произведение"
 
 
+class TitleStats(models.Model):
+    """Review statistics of a title, kept up to date on review writes."""
+
+    SCORES = range(1, 11)
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Произведение",
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество отзывов",
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Сумма оценок",
+    )
+    histogram = models.CharField(
+        max_length=128,
+        default=",".join("0" for _ in SCORES),
+        verbose_name="Количество оценок от 1 до 10",
+    )
+    last_review_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Дата последнего отзыва",
+    )
+
+    @property
+    def rating(self):
+        if not self.review_count:
+            return None
+
+        return self.score_sum / self.review_count
+
+    def get_histogram(self):
+        return dict(zip(self.SCORES, map(int, self.histogram.split(","))))
+
+    def set_histogram(self, histogram):
+        self.histogram = ",".join(
+            str(histogram.get(score, 0)) for score in self.SCORES
+        )
+
+    class Meta:
+        verbose_name = "Статистика произведения"
+
+
 class Review(models.Model):
     text = models.TextField(verbose_name="Текст отзыва")
     author = models.ForeignKey(
@@ -123,6 +174,10 @@ class Review(models.Model):
         null=False,
         verbose_name="Произведение",
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name="Скрыт",
+    )
 
     class Meta:
         constraints = [
@@ -130,6 +185,17 @@ class Review(models.Model):
                 fields=["author", "title"], name="unique_review"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="review_author_pub_date_idx",
+            ),
+            models.Index(
+                fields=["-id"],
+                name="review_hidden_idx",
+                condition=models.Q(is_hidden=True),
+            ),
+        ]
         verbose_name = "Отзыв"
 
 
@@ -156,6 +222,167 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name="Дата публикации",
     )
+    is_hidden = models.BooleanField(
+        default=False,
+        verbose_name="Скрыт",
+    )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="comment_author_pub_date_idx",
+            ),
+            models.Index(
+                fields=["-id"],
+                name="comment_hidden_idx",
+                condition=models.Q(is_hidden=True),
+            ),
+        ]
         verbose_name = "Комментарий"
+
+
+class Change(models.Model):
+    ACTION_CHOICES = (
+        ("create", "создание"),
+        ("update", "изменение"),
+        ("delete", "удаление"),
+    )
+    TABLE_CHOICES = (
+        ("titles", "произведение"),
+        ("review", "отзыв"),
+        ("comments", "комментарий"),
+    )
+
+    table = models.CharField(
+        max_length=25,
+        choices=TABLE_CHOICES,
+        verbose_name="Таблица",
+    )
+    object_id = models.PositiveIntegerField(verbose_name="ID объекта")
+    action = models.CharField(
+        max_length=25,
+        choices=ACTION_CHOICES,
+        verbose_name="Действие",
+    )
+    data = models.TextField(
+        blank=True,
+        verbose_name="Данные",
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name="Дата изменения",
+    )
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["table", "object_id"])]
+        verbose_name = "Изменение"
+
+
+UNFINISHED_DELETION_STATUSES = ("pending", "running", "failed")
+
+
+class DeletionJob(models.Model):
+    TARGET_CHOICES = (
+        ("user", "пользователь"),
+        ("title", "произведение"),
+    )
+    STATUS_CHOICES = (
+        ("pending", "в очереди"),
+        ("running", "выполняется"),
+        ("done", "завершено"),
+        ("failed", "ошибка"),
+    )
+
+    target = models.CharField(
+        max_length=25,
+        choices=TARGET_CHOICES,
+        verbose_name="Объект удаления",
+    )
+    object_id = models.PositiveIntegerField(verbose_name="ID объекта")
+    status = models.CharField(
+        max_length=25,
+        choices=STATUS_CHOICES,
+        default="pending",
+        db_index=True,
+        verbose_name="Статус",
+    )
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Всего связанных записей",
+    )
+    deleted = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Удалено связанных записей",
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="Ошибка",
+    )
+    heartbeat = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Последний признак работы",
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания",
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата обновления",
+    )
+
+    class Meta:
+        constraints = [
+            # One unfinished job per object, so retried requests reuse it.
+            models.UniqueConstraint(
+                fields=["target", "object_id"],
+                name="unique_unfinished_deletion_job",
+                condition=models.Q(status__in=UNFINISHED_DELETION_STATUSES),
+            )
+        ]
+        ordering = ["-id"]
+        verbose_name = "Задача удаления"
+
+
+class IdempotencyKey(models.Model):
+    """Response to a create request, replayed for retries with its key."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+        verbose_name="Пользователь",
+    )
+    key = models.CharField(
+        max_length=255,
+        verbose_name="Ключ",
+    )
+    fingerprint = models.CharField(
+        max_length=64,
+        verbose_name="Отпечаток запроса",
+    )
+    status_code = models.PositiveSmallIntegerField(
+        null=True,
+        verbose_name="Код ответа",
+    )
+    response = models.TextField(
+        blank=True,
+        verbose_name="Ответ",
+    )
+    created = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+        verbose_name="Дата создания",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_idempotency_key"
+            )
+        ]
+        verbose_name = "Ключ идемпотентности"
@@ -0,0 +1,87 @@
+"""Bulk moderation of reviews and comments.
+
+Hiding works like the set-based deletion: the matching rows are walked in
+chunks of primary keys and every chunk is changed with a single UPDATE,
+recording the change log and refreshing title stats as it goes. Hidden
+rows stay in the database but are left out of listings and ratings; for
+change-log readers hiding is a deletion and showing again a creation.
+Like deletion, every chunk runs in its own transaction.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .changes import record_changes, record_deletions
+from .deletion import chunked_rows, delete_comments, delete_reviews
+from .models import Comment, Review
+from .stats import refresh_title_stats
+
+MODERATION_ACTIONS = ("delete", "hide", "show")
+
+
+def _set_hidden(model, pks, hidden):
+    changed = model.objects.filter(pk__in=pks).update(is_hidden=hidden)
+
+    if hidden:
+        record_deletions(model, pks)
+    else:
+        record_changes(model.objects.filter(pk__in=pks), "create")
+
+    return changed
+
+
+def set_comments_hidden(queryset, hidden, chunk_size=None):
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    changed = 0
+    rows = chunked_rows(
+        queryset.exclude(is_hidden=hidden), ("pk",), chunk_size
+    )
+
+    for chunk in rows:
+        with transaction.atomic():
+            changed += _set_hidden(Comment, [pk for pk, in chunk], hidden)
+
+    return changed
+
+
+def set_reviews_hidden(queryset, hidden, chunk_size=None):
+    """Hide or show reviews, keeping title stats in sync."""
+    chunk_size = chunk_size or settings.DELETION_CHUNK_SIZE
+    changed = 0
+    rows = chunked_rows(
+        queryset.exclude(is_hidden=hidden), ("pk", "title_id"), chunk_size
+    )
+
+    for chunk in rows:
+        with transaction.atomic():
+            changed += _set_hidden(Review, [pk for pk, _ in chunk], hidden)
+            refresh_title_stats(
+                {title_id for _, title_id in chunk}, create_missing=False
+            )
+
+    return changed
+
+
+MODERATION_TARGETS = {
+    "reviews": (Review, delete_reviews, set_reviews_hidden),
+    "comments": (Comment, delete_comments, set_comments_hidden),
+}
+
+
+def moderate(target, action, queryset):
+    """Apply a moderation action to all matching rows chunk by chunk.
+
+    Every chunk commits on its own, so a large selection neither holds its
+    row locks to the end nor keeps change-log entries uncommitted for
+    longer than the change feed waits for them. Returns the number of
+    matching rows and of rows actually deleted or changed; deleted reviews
+    count their comments too.
+    """
+    _, delete, set_hidden = MODERATION_TARGETS[target]
+    matched = queryset.count()
+
+    if action == "delete":
+        affected = delete(queryset)
+    else:
+        affected = set_hidden(queryset, action == "hide")
+
+    return {"matched": matched, "affected": affected}
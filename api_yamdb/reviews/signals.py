@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import category_cache, genre_cache
+from .changes import record_changes
+from .models import Category, Comment, Genre, Review, Title
+from .stats import create_empty_stats, refresh_title_stats
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        record_changes([instance], "create" if created else "update")
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def log_delete(sender, instance, **kwargs):
+    record_changes([instance], "delete")
+
+
+@receiver(post_save, sender=Title)
+def create_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        create_empty_stats([instance])
+
+
+@receiver(post_save, sender=Review)
+def refresh_stats_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_title_stats([instance.title_id])
+
+
+@receiver(post_delete, sender=Review)
+def refresh_stats_on_delete(sender, instance, **kwargs):
+    refresh_title_stats([instance.title_id], create_missing=False)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genre_cache(sender, **kwargs):
+    genre_cache.invalidate()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    category_cache.invalidate()
@@ -0,0 +1,105 @@
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .models import Review, Title, TitleStats
+
+STATS_FIELDS = ("review_count", "score_sum", "histogram", "last_review_at")
+
+
+def compute_title_stats(title_ids):
+    """Build unsaved stats of many titles with one grouped aggregate query."""
+    title_ids = {int(title_id) for title_id in title_ids}
+    histograms = {title_id: {} for title_id in title_ids}
+    stats = {title_id: TitleStats(title_id=title_id) for title_id in title_ids}
+
+    rows = (
+        Review.objects.filter(title_id__in=stats, is_hidden=False)
+        .order_by()
+        .values("title_id", "score")
+        .annotate(count=Count("pk"), last_review_at=Max("pub_date"))
+    )
+
+    for row in rows:
+        title_stats = stats[row["title_id"]]
+        title_stats.review_count += row["count"]
+        title_stats.score_sum += row["score"] * row["count"]
+        histograms[row["title_id"]][row["score"]] = row["count"]
+
+        if (
+            title_stats.last_review_at is None
+            or row["last_review_at"] > title_stats.last_review_at
+        ):
+            title_stats.last_review_at = row["last_review_at"]
+
+    for title_id, title_stats in stats.items():
+        title_stats.set_histogram(histograms[title_id])
+
+    return stats
+
+
+def attach_missing_stats(titles):
+    """Give titles without a stored stats row stats computed on the fly.
+
+    Missing rows (titles reviewed before stats were stored, until the
+    refresh_stats command is run) are computed with one query and attached
+    unsaved, so reads never write.
+    """
+    missing = [
+        title for title in titles if getattr(title, "stats", None) is None
+    ]
+
+    if missing:
+        stats = compute_title_stats(title.pk for title in missing)
+
+        for title in missing:
+            title.stats = stats[title.pk]
+
+
+def create_empty_stats(titles):
+    """Store zero stats of new titles, so reads never have to compute them."""
+    TitleStats.objects.bulk_create(
+        (TitleStats(title_id=title.pk) for title in titles),
+        ignore_conflicts=True,
+    )
+
+
+@transaction.atomic
+def refresh_title_stats(title_ids, create_missing=True):
+    """Recompute and store stats of the given titles.
+
+    The titles are locked before the reviews are aggregated, so concurrent
+    refreshes of a title run one after another and the last one stores
+    stats including every committed review. Existing rows are rewritten
+    with one bulk update. Missing rows are only created when create_missing
+    is set, so refreshing while a title is being deleted never inserts a
+    row the cascade has not collected.
+    """
+    locked = list(
+        Title.objects.select_for_update()
+        .filter(pk__in={int(title_id) for title_id in title_ids})
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    stats = compute_title_stats(locked)
+
+    if not stats:
+        return stats
+
+    existing = set(
+        TitleStats.objects.filter(pk__in=stats).values_list("pk", flat=True)
+    )
+    TitleStats.objects.bulk_update(
+        [stats[title_id] for title_id in existing], STATS_FIELDS
+    )
+
+    if create_missing and len(existing) < len(stats):
+        TitleStats.objects.bulk_create(
+            (
+                title_stats
+                for title_id, title_stats in stats.items()
+                if title_id not in existing
+            ),
+            ignore_conflicts=True,
+        )
+
+    return stats
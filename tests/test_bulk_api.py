@@ -0,0 +1,230 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.serializers import TitleBulkSerializer
+from reviews.models import Category, Genre, Review, Title, User
+
+@pytest.fixture
+def catalog():
+    Category.objects.create(name='Фильм', slug='movie')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+
+
+@pytest.fixture
+def admin_client():
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create(username='admin', email='admin@example.com', role='admin')
+    )
+    return client
+
+
+def title_data(number, genre=('drama',), category='movie'):
+    return {
+        'name': f'Фильм {number}',
+        'year': 2000 + number,
+        'genre': list(genre),
+        'category': category,
+    }
+
+
+@pytest.mark.django_db
+class TestTitleBulk:
+
+    def test_one_query_per_slug_model(self, catalog, django_assert_num_queries):
+        serializer = TitleBulkSerializer(
+            data=[
+                title_data(number, ('drama', 'comedy')[: number % 2 + 1])
+                for number in range(20)
+            ],
+            many=True,
+        )
+
+        with django_assert_num_queries(2):
+            assert serializer.is_valid(), serializer.errors
+
+    def test_per_item_errors(self, catalog, admin_client):
+        response = admin_client.post('/api/v1/titles/bulk/', [
+            title_data(1),
+            title_data(2, genre=('drama', 'horror')),
+            title_data(3, category='book'),
+        ], format='json')
+
+        assert response.status_code == 400
+        assert response.json() == [
+            {},
+            {'genre': ["Жанр 'horror' не найден."]},
+            {'category': ["Категория 'book' не найдена."]},
+        ], 'Проверьте, что ошибки возвращаются для каждого элемента по порядку'
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке не создаётся ни одно произведение'
+        )
+
+    def test_field_and_batch_errors_together(self, catalog, admin_client):
+        response = admin_client.post('/api/v1/titles/bulk/', [
+            {**title_data(1), 'year': 3000},
+            title_data(2, genre=('horror',)),
+        ], format='json')
+
+        assert response.status_code == 400
+        errors = response.json()
+        assert list(errors[0]) == ['year'] and errors[1] == {
+            'genre': ["Жанр 'horror' не найден."]
+        }, (
+            'Проверьте, что ошибки полей не скрывают ошибки, '
+            'найденные по всему пакету'
+        )
+
+    def test_max_items(self, catalog, admin_client, settings):
+        settings.BULK_MAX_ITEMS = 2
+        response = admin_client.post('/api/v1/titles/bulk/', [
+            title_data(number) for number in range(3)
+        ], format='json')
+
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Не больше 2 объектов за запрос.']
+        }, 'Проверьте, что размер пакета ограничен BULK_MAX_ITEMS'
+        assert not Title.objects.exists()
+
+    def test_create(self, catalog, admin_client):
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', [title_data(1), title_data(2)], format='json'
+        )
+
+        assert response.status_code == 201
+        assert sorted(title['name'] for title in response.json()) == [
+            'Фильм 1', 'Фильм 2'
+        ]
+        assert Title.objects.filter(genre__slug='drama').count() == 2
+        assert Title.objects.filter(stats__review_count=0).count() == 2, (
+            'Проверьте, что у новых произведений есть строка статистики'
+        )
+
+    def test_update(self, catalog, admin_client):
+        category = Category.objects.get()
+        titles = [
+            Title.objects.create(name=f'Фильм {number}', year=2000, category=category)
+            for number in range(2)
+        ]
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': titles[0].pk, 'name': 'Новое название'},
+            {'id': titles[1].pk, 'genre': ['comedy']},
+        ], format='json')
+
+        assert response.status_code == 200
+        assert Title.objects.get(pk=titles[0].pk).name == 'Новое название'
+        assert list(titles[1].genre.values_list('slug', flat=True)) == ['comedy']
+
+    def test_update_missing_id(self, catalog, admin_client):
+        category = Category.objects.get()
+        title = Title.objects.create(name='Фильм', year=2000, category=category)
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': title.pk, 'name': 'Новое название'},
+            {'id': title.pk + 1000, 'name': 'Нет такого'},
+            {'name': 'Без id'},
+        ], format='json')
+
+        assert response.status_code == 400
+        assert response.json() == [
+            {},
+            {'id': ['Произведение не найдено.']},
+            {'id': ['Произведение не найдено.']},
+        ], 'Проверьте, что произведение без id или с неизвестным id отклоняется'
+        assert Title.objects.get().name == 'Фильм'
+
+
+@pytest.mark.django_db
+class TestGenreBulk:
+
+    def test_duplicate_slugs(self, catalog, admin_client):
+        response = admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Триллер', 'slug': 'thriller'},
+            {'name': 'Ещё триллер', 'slug': 'thriller'},
+        ], format='json')
+
+        assert response.status_code == 400
+        assert response.json() == [
+            {'slug': ['Такой slug уже существует.']},
+            {},
+            {'slug': ['Такой slug уже существует.']},
+        ], 'Проверьте, что повтор slug в базе и внутри пакета отклоняется'
+        assert Genre.objects.count() == 2
+
+    def test_field_and_duplicate_errors_together(self, catalog, admin_client):
+        response = admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Триллер', 'slug': 'не slug'},
+            {'name': 'Драма', 'slug': 'drama'},
+        ], format='json')
+
+        assert response.status_code == 400
+        errors = response.json()
+        assert list(errors[0]) == ['slug'] and errors[1] == {
+            'slug': ['Такой slug уже существует.']
+        }, 'Проверьте, что ошибки полей и повторы slug возвращаются вместе'
+
+    def test_create(self, catalog, admin_client):
+        response = admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Триллер', 'slug': 'thriller'},
+            {'name': 'Вестерн', 'slug': 'western'},
+        ], format='json')
+
+        assert response.status_code == 201
+        assert set(Genre.objects.values_list('slug', flat=True)) == {
+            'drama', 'comedy', 'thriller', 'western'
+        }
+
+
+@pytest.mark.django_db
+class TestReviewBulk:
+
+    @pytest.fixture
+    def title(self, catalog):
+        title = Title.objects.create(
+            name='Солярис', year=1972, category=Category.objects.get()
+        )
+        for username in ('critic', 'reader', 'viewer'):
+            User.objects.create(username=username, email=f'{username}@example.com')
+        Review.objects.create(
+            title=title, author=User.objects.get(username='critic'),
+            text='Отзыв', score=8,
+        )
+        return title
+
+    def url(self, title):
+        return f'/api/v1/titles/{title.pk}/reviews/bulk/'
+
+    def test_errors(self, title, admin_client, django_assert_max_num_queries):
+        data = [
+            {'author': 'critic', 'text': 'Ещё отзыв', 'score': 5},
+            {'author': 'reader', 'text': 'Отзыв', 'score': 7},
+            {'author': 'reader', 'text': 'Снова отзыв', 'score': 6},
+            {'author': 'ghost', 'text': 'Отзыв', 'score': 6},
+        ]
+
+        # Произведение, авторы и уже оставленные отзывы — по одному запросу.
+        with django_assert_max_num_queries(3):
+            response = admin_client.post(self.url(title), data, format='json')
+
+        assert response.status_code == 400
+        assert response.json() == [
+            {'author': ['Отзыв уже существует.']},
+            {},
+            {'author': ['Отзыв уже существует.']},
+            {'author': ['Пользователь не найден.']},
+        ], 'Проверьте, что повторные отзывы в базе и внутри пакета отклоняются'
+        assert Review.objects.count() == 1
+
+    def test_create(self, title, admin_client):
+        response = admin_client.post(self.url(title), [
+            {'author': 'reader', 'text': 'Отзыв', 'score': 6},
+            {'author': 'viewer', 'text': 'Отзыв', 'score': 10},
+        ], format='json')
+
+        assert response.status_code == 201
+        title.stats.refresh_from_db()
+        assert (title.stats.review_count, title.stats.rating) == (3, 8), (
+            'Проверьте, что массовое добавление отзывов обновляет рейтинг'
+        )
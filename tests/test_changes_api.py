@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reviews.models import Change, User
+
+
+@pytest.fixture
+def feed(settings):
+    settings.CHANGES_SETTLE_SECONDS = 30
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create(username='reader', email='reader@example.com')
+    )
+
+    def get(since):
+        response = client.get('/api/v1/changes/', {'since': since})
+        assert response.status_code == 200
+        return response.json()
+
+    return get
+
+
+def add_change(pk, age_seconds=0):
+    change = Change.objects.create(
+        id=pk, table='titles', object_id=pk, action='create', data='{}'
+    )
+    Change.objects.filter(pk=pk).update(
+        created=timezone.now() - timedelta(seconds=age_seconds)
+    )
+    return change
+
+
+def age_all(seconds):
+    Change.objects.update(created=timezone.now() - timedelta(seconds=seconds))
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+
+    def test_late_commit_is_delivered(self, feed):
+        # Transaction B took id 11 and committed before A, which took id 10.
+        add_change(11)
+
+        page = feed(9)
+        assert page['results'] == [] and page['next'] == 9, (
+            'Проверьте, что неустоявшиеся изменения не отдаются и курсор не сдвигается'
+        )
+
+        add_change(10)
+        age_all(31)
+
+        page = feed(9)
+        assert [change['id'] for change in page['results']] == [10, 11], (
+            'Проверьте, что изменение, зафиксированное позже, не теряется'
+        )
+        assert page['next'] == 11
+
+    def test_stops_at_first_unsettled(self, feed):
+        add_change(11, age_seconds=60)
+        add_change(12)
+        add_change(13, age_seconds=60)
+
+        page = feed(10)
+        assert [change['id'] for change in page['results']] == [11], (
+            'Проверьте, что курсор не перескакивает неустоявшиеся изменения'
+        )
+        assert page['next'] == 11
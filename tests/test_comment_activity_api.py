@@ -0,0 +1,86 @@
+import datetime as dt
+
+import pytest
+from django.utils import timezone
+from rest_framework.fields import DateTimeField
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Review, Title, User
+
+INCLUDE = {'include': 'comment_count,last_comment_at'}
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return Title.objects.create(name='Солярис', year=1972, category=category)
+
+
+def add_review(title, username, comments=0):
+    author = User.objects.create(username=username, email=f'{username}@example.com')
+    review = Review.objects.create(title=title, author=author, text='Отзыв', score=8)
+    for _ in range(comments):
+        Comment.objects.create(review=review, author=author, text='Комментарий')
+    return review
+
+
+def reviews_url(title):
+    return f'/api/v1/titles/{title.pk}/reviews/'
+
+
+@pytest.mark.django_db
+class TestCommentActivity:
+
+    def test_hidden_comments_excluded(self, title):
+        review = add_review(title, 'critic', comments=3)
+        visible, latest, hidden = review.comments.order_by('id')
+        now = timezone.now()
+        Comment.objects.filter(pk=visible.pk).update(pub_date=now - dt.timedelta(days=2))
+        Comment.objects.filter(pk=latest.pk).update(pub_date=now - dt.timedelta(days=1))
+        Comment.objects.filter(pk=hidden.pk).update(pub_date=now, is_hidden=True)
+
+        result, = APIClient().get(reviews_url(title), INCLUDE).json()['results']
+
+        assert result['comment_count'] == 2, (
+            'Проверьте, что скрытые комментарии не учитываются в comment_count'
+        )
+        latest.refresh_from_db()
+        assert result['last_comment_at'] == (
+            DateTimeField().to_representation(latest.pub_date)
+        ), 'Проверьте, что last_comment_at не учитывает скрытые комментарии'
+
+    def test_review_without_comments(self, title):
+        add_review(title, 'critic')
+
+        result, = APIClient().get(reviews_url(title), INCLUDE).json()['results']
+
+        assert (result['comment_count'], result['last_comment_at']) == (0, None)
+
+    @pytest.mark.parametrize('url', [
+        lambda title: reviews_url(title),
+        lambda title: '/api/v1/users/critic/reviews/',
+    ])
+    def test_fields_only_when_included(self, title, url):
+        add_review(title, 'critic', comments=1)
+        client = APIClient()
+
+        plain, = client.get(url(title)).json()['results']
+        included, = client.get(url(title), INCLUDE).json()['results']
+
+        assert not {'comment_count', 'last_comment_at'} & set(plain), (
+            'Проверьте, что поля активности выводятся только с ?include='
+        )
+        assert included['comment_count'] == 1
+        assert set(included) - set(plain) == {'comment_count', 'last_comment_at'}
+
+    def test_fixed_number_of_queries(self, title, django_assert_num_queries):
+        for number in range(5):
+            add_review(title, f'user{number}', comments=number)
+
+        # Произведение, число отзывов и страница с аннотациями.
+        with django_assert_num_queries(3):
+            response = APIClient().get(reviews_url(title), INCLUDE)
+
+        assert [result['comment_count'] for result in response.json()['results']] == [
+            0, 1, 2, 3, 4
+        ]
@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+from django.core.cache import caches
+from django.db.utils import ConnectionHandler, ConnectionRouter
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from api_yamdb.middleware import ReplicaRoutingMiddleware
+from api_yamdb.routers import ReplicaRouter, read_from_primary
+from reviews.cache import genre_cache
+from reviews.models import Title
+
+
+@pytest.fixture
+def databases(tmp_path, settings, django_db_blocker):
+    """Primary and replica as two SQLite files holding different data.
+
+    The files are opened through their own connections, so the test database
+    of the project is not touched.
+    """
+    names = {}
+
+    for alias in ('default', 'replica_0'):
+        names[alias] = str(tmp_path / f'{alias}.sqlite3')
+        with sqlite3.connect(names[alias]) as db:
+            db.execute('CREATE TABLE source (alias TEXT)')
+            db.execute('INSERT INTO source VALUES (?)', (alias,))
+
+    settings.DATABASE_REPLICAS = ['replica_0']
+    handler = ConnectionHandler({
+        alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+        for alias, name in names.items()
+    })
+    with django_db_blocker.unblock():
+        yield handler
+        handler.close_all()
+
+
+@pytest.fixture
+def sticky_cache(settings):
+    settings.REPLICA_STICKY_CACHE_ALIAS = 'default'
+    caches['default'].clear()
+    yield
+    caches['default'].clear()
+
+
+def read_source(databases):
+    """Run a read the way the ORM would and report which file served it."""
+    alias = ConnectionRouter([ReplicaRouter()]).db_for_read(Title)
+    with databases[alias].cursor() as cursor:
+        cursor.execute('SELECT alias FROM source')
+        return cursor.fetchone()[0]
+
+
+def request_reading(databases, method='get', **extra):
+    """Send a request through the middleware, reading from the view."""
+    sources = []
+
+    def view(request):
+        sources.append(read_source(databases))
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    middleware(getattr(RequestFactory(), method)('/api/v1/titles/', **extra))
+    return sources[0]
+
+
+@pytest.mark.usefixtures('sticky_cache')
+class TestReplicaRouting:
+
+    def test_outside_requests_read_primary(self, databases):
+        assert read_source(databases) == 'default', (
+            'Проверьте, что вне запроса чтение идёт из основной базы'
+        )
+
+    def test_safe_request_reads_replica(self, databases):
+        assert request_reading(databases) == 'replica_0', (
+            'Проверьте, что GET-запросы читают из реплики'
+        )
+
+    def test_unsafe_request_reads_primary(self, databases):
+        assert request_reading(databases, 'post') == 'default', (
+            'Проверьте, что изменяющие запросы читают из основной базы'
+        )
+
+    def test_reads_after_write_are_sticky(self, databases):
+        auth = {'HTTP_AUTHORIZATION': 'Bearer writer'}
+        request_reading(databases, 'post', **auth)
+
+        assert request_reading(databases, **auth) == 'default', (
+            'Проверьте, что после записи клиент читает из основной базы'
+        )
+        assert request_reading(
+            databases, HTTP_AUTHORIZATION='Bearer other'
+        ) == 'replica_0', (
+            'Проверьте, что привязка к основной базе не влияет на других клиентов'
+        )
+
+    def test_anonymous_writes_are_not_sticky(self, databases):
+        request_reading(databases, 'post', REMOTE_ADDR='10.0.0.1')
+
+        assert request_reading(databases, REMOTE_ADDR='10.0.0.1') == 'replica_0', (
+            'Проверьте, что анонимные запросы на запись не привязывают '
+            'к основной базе всех клиентов за прокси'
+        )
+
+    def test_without_replicas_reads_primary(self, databases, settings):
+        settings.DATABASE_REPLICAS = []
+
+        assert request_reading(databases) == 'default'
+
+    def test_slug_cache_loads_from_primary(self, settings):
+        settings.DATABASE_REPLICAS = ['replica_0']
+        token = read_from_primary.set(False)
+        try:
+            assert Title.objects.all().db == 'replica_0'
+            assert genre_cache.rows().db == 'default', (
+                'Проверьте, что кэш жанров и категорий загружается из основной базы'
+            )
+        finally:
+            read_from_primary.reset(token)
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reviews.deletion import run_deletion_job
+from reviews.models import (Category, Comment, DeletionJob, Review, Title,
+                            TitleStats, User)
+
+
+@pytest.fixture
+def admin_client(settings):
+    settings.DELETION_ASYNC_THRESHOLD = 0
+    settings.DELETION_CHUNK_SIZE = 1
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create(username='admin', email='admin@example.com', role='admin')
+    )
+    return client
+
+
+@pytest.fixture
+def reviewed_titles():
+    """Три произведения: critic оценил все, reader — первые два."""
+    category = Category.objects.create(name='Фильм', slug='movie')
+    critic = User.objects.create(username='critic', email='critic@example.com')
+    reader = User.objects.create(username='reader', email='reader@example.com')
+    titles = []
+
+    for number, name in enumerate(('Солярис', 'Сталкер', 'Зеркало')):
+        title = Title.objects.create(name=name, year=1972, category=category)
+        review = Review.objects.create(
+            title=title, author=critic, text='Отзыв', score=10
+        )
+        Comment.objects.create(review=review, author=reader, text='Согласен')
+
+        if number < 2:
+            reader_review = Review.objects.create(
+                title=title, author=reader, text='Отзыв', score=4 + number
+            )
+            Comment.objects.create(review=reader_review, author=critic, text='Нет')
+
+        titles.append(title)
+
+    return critic, titles
+
+
+def delete_user(client, username):
+    response = client.delete(f'/api/v1/users/{username}/')
+    assert response.status_code == 202
+    return response.json()
+
+
+@pytest.mark.django_db
+class TestDeletionJobs:
+
+    def test_retry_returns_running_job(self, admin_client, reviewed_titles):
+        first = delete_user(admin_client, 'critic')
+        DeletionJob.objects.filter(pk=first['id']).update(
+            status='running', heartbeat=timezone.now()
+        )
+        second = delete_user(admin_client, 'critic')
+
+        assert second['id'] == first['id'], (
+            'Проверьте, что повторный запрос на удаление возвращает уже запущенную задачу'
+        )
+        assert DeletionJob.objects.count() == 1
+
+    def test_live_job_is_not_taken_over(self, admin_client, reviewed_titles):
+        job = delete_user(admin_client, 'critic')
+        DeletionJob.objects.filter(pk=job['id']).update(
+            status='running', heartbeat=timezone.now()
+        )
+
+        call_command('run_deletion_jobs', '--resume')
+
+        assert not run_deletion_job(job['id'])
+        assert DeletionJob.objects.get().status == 'running', (
+            'Проверьте, что задачу с живым исполнителем не запускают повторно'
+        )
+        assert User.objects.filter(username='critic').exists()
+
+    def test_abandoned_job_is_taken_over(self, admin_client, reviewed_titles, settings):
+        settings.DELETION_JOB_LEASE_SECONDS = 60
+        job = delete_user(admin_client, 'critic')
+        DeletionJob.objects.filter(pk=job['id']).update(
+            status='running', heartbeat=timezone.now() - timedelta(minutes=5)
+        )
+
+        assert delete_user(admin_client, 'critic')['id'] == job['id']
+
+        call_command('run_deletion_jobs', '--resume')
+
+        assert DeletionJob.objects.get().status == 'done', (
+            'Проверьте, что задачу, исполнитель которой перестал отвечать, подхватывают снова'
+        )
+        assert not User.objects.filter(username='critic').exists()
+
+    def test_user_deletion_keeps_stats(self, admin_client, reviewed_titles):
+        critic, titles = reviewed_titles
+        job = delete_user(admin_client, 'critic')
+
+        assert run_deletion_job(job['id'])
+
+        stats = {
+            stats.title_id: (stats.review_count, stats.score_sum, stats.rating)
+            for stats in TitleStats.objects.all()
+        }
+        assert stats == {
+            titles[0].pk: (1, 4, 4),
+            titles[1].pk: (1, 5, 5),
+            titles[2].pk: (0, 0, None),
+        }, 'Проверьте, что после удаления пользователя статистика каждого произведения пересчитана'
+        assert not Review.objects.filter(author=critic).exists()
+        assert not Comment.objects.filter(author=critic).exists()
+        assert not User.objects.filter(username='critic').exists()
+        assert DeletionJob.objects.get().deleted == 8, (
+            'Проверьте, что удалённые отзывы и комментарии посчитаны один раз'
+        )
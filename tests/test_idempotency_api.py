@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reviews.inserts import insert_ignoring_conflicts
+from reviews.models import Category, Comment, IdempotencyKey, Review, Title, User
+
+
+@pytest.fixture
+def review(settings):
+    settings.IDEMPOTENCY_KEY_TTL_HOURS = 24
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(name='Солярис', year=1972, category=category)
+    author = User.objects.create(username='critic', email='critic@example.com')
+    return Review.objects.create(title=title, author=author, text='Отзыв', score=8)
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create(username='reader', email='reader@example.com')
+    )
+    return client
+
+
+def post(client, url, data, key):
+    return client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+
+def comments_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+
+
+def expire_keys():
+    IdempotencyKey.objects.update(created=timezone.now() - timedelta(hours=25))
+
+
+@pytest.mark.django_db
+class TestIdempotentCreate:
+
+    def test_replay(self, client, review):
+        first = post(client, comments_url(review), {'text': 'Согласен'}, 'key-1')
+        second = post(client, comments_url(review), {'text': 'Согласен'}, 'key-1')
+
+        assert first.status_code == 201
+        assert second.status_code == 201 and second.json() == first.json(), (
+            'Проверьте, что повтор запроса с тем же ключом возвращает исходный ответ'
+        )
+        assert second['Idempotent-Replayed'] == 'true'
+        assert Comment.objects.count() == 1, (
+            'Проверьте, что повтор запроса не создаёт объект ещё раз'
+        )
+
+    def test_fingerprint_mismatch(self, client, review):
+        post(client, comments_url(review), {'text': 'Согласен'}, 'key-1')
+        response = post(client, comments_url(review), {'text': 'Не согласен'}, 'key-1')
+
+        assert response.status_code == 400, (
+            'Проверьте, что ключ нельзя использовать для другого запроса'
+        )
+        assert Comment.objects.count() == 1
+
+    def test_expired_key_is_claimed_again(self, client, review):
+        post(client, comments_url(review), {'text': 'Согласен'}, 'key-1')
+        expire_keys()
+        response = post(client, comments_url(review), {'text': 'Не согласен'}, 'key-1')
+
+        assert response.status_code == 201 and 'Idempotent-Replayed' not in response, (
+            'Проверьте, что истёкший ключ можно использовать снова'
+        )
+        assert Comment.objects.count() == 2
+
+    def test_failed_create_keeps_key(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        failed = post(client, url, {'text': 'Шедевр', 'score': 11}, 'key-1')
+        created = post(client, url, {'text': 'Шедевр', 'score': 10}, 'key-1')
+
+        assert failed.status_code == 400
+        assert created.status_code == 201, (
+            'Проверьте, что неудачный запрос не расходует ключ'
+        )
+
+    def test_purge(self, client, review):
+        post(client, comments_url(review), {'text': 'Согласен'}, 'key-1')
+        expire_keys()
+        post(client, comments_url(review), {'text': 'Согласен'}, 'key-2')
+
+        call_command('purge_idempotency_keys')
+
+        assert list(IdempotencyKey.objects.values_list('key', flat=True)) == ['key-2'], (
+            'Проверьте, что удаляются только истёкшие ключи'
+        )
+
+    def test_conflicting_insert(self, client, review):
+        sent = []
+
+        def receiver(signal, **kwargs):
+            sent.append(signal)
+
+        pre_save.connect(receiver, sender=IdempotencyKey)
+        post_save.connect(receiver, sender=IdempotencyKey)
+        user = User.objects.get(username='critic')
+        try:
+            assert insert_ignoring_conflicts(
+                IdempotencyKey(user=user, key='key-1', fingerprint='a')
+            )
+            assert not insert_ignoring_conflicts(
+                IdempotencyKey(user=user, key='key-1', fingerprint='b')
+            ), 'Проверьте, что повторная вставка ключа не проходит'
+        finally:
+            pre_save.disconnect(receiver, sender=IdempotencyKey)
+            post_save.disconnect(receiver, sender=IdempotencyKey)
+
+        assert sent == [pre_save, post_save, pre_save], (
+            'Проверьте, что вставка отправляет сигналы как обычное сохранение'
+        )
+        assert IdempotencyKey.objects.get().fingerprint == 'a', (
+            'Проверьте, что после конфликта транзакция остаётся рабочей'
+        )
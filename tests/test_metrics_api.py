@@ -0,0 +1,106 @@
+import csv
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from api_yamdb import metrics
+from api_yamdb.views import metrics_view
+
+
+@pytest.fixture
+def registered():
+    """Метрики, созданные в тесте, убираются из реестра после него."""
+    names = set(metrics.REGISTRY)
+    yield
+    for name in set(metrics.REGISTRY) - names:
+        del metrics.REGISTRY[name]
+
+
+@pytest.mark.usefixtures('registered')
+class TestMetrics:
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram(
+            'test_latency_seconds', 'Задержка.', ('route',), buckets=(0.1, 1)
+        )
+        for value in (0.25, 0.5, 5):
+            histogram.observe(value, route='titles')
+
+        assert list(histogram.render(histogram.state())) == [
+            'test_latency_seconds_bucket{route="titles",le="0.1"} 0',
+            'test_latency_seconds_bucket{route="titles",le="1"} 2',
+            'test_latency_seconds_bucket{route="titles",le="+Inf"} 3',
+            'test_latency_seconds_sum{route="titles"} 5.75',
+            'test_latency_seconds_count{route="titles"} 3',
+        ], 'Проверьте, что корзины гистограммы выводятся нарастающим итогом'
+
+    def test_snapshots_of_processes_are_summed(self, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        counter = metrics.Counter('test_requests_total', 'Запросы.', ('route',))
+        histogram = metrics.Histogram(
+            'test_merge_seconds', 'Задержка.', buckets=(1,)
+        )
+        counter.inc(2, route='titles')
+        histogram.observe(0.5)
+        (tmp_path / '1.dead.json').write_text(json.dumps({
+            'test_requests_total': [[['titles'], 3], [['genres'], 1]],
+            'test_merge_seconds': [[[], [0, 1, 2.0]]],
+        }))
+
+        collected = metrics.collect()
+
+        assert sorted(collected['test_requests_total']) == [
+            [['genres'], 1], [['titles'], 5]
+        ], 'Проверьте, что счётчики всех процессов складываются'
+        assert collected['test_merge_seconds'] == [[[], [1, 1, 2.5]]]
+
+    def test_snapshot_name_changes_after_fork(self, monkeypatch):
+        name = metrics.snapshot_name()
+        assert name.startswith(f'{os.getpid()}.')
+        assert metrics.snapshot_name() == name
+
+        monkeypatch.setattr(metrics, '_snapshot_pid', None)
+
+        assert metrics.snapshot_name() != name, (
+            'Проверьте, что снимок нового процесса не перезаписывает '
+            'снимок завершившегося процесса с тем же pid'
+        )
+
+
+class TestMetricsView:
+
+    @pytest.mark.parametrize('remote_addr, token, status_code', [
+        ('127.0.0.1', None, 200),
+        ('10.0.0.5', None, 403),
+        ('10.0.0.5', 'wrong', 403),
+        ('10.0.0.5', 'secret', 200),
+    ])
+    def test_access(self, settings, remote_addr, token, status_code):
+        settings.METRICS_TOKEN = 'secret'
+        settings.METRICS_ALLOWED_IPS = ['127.0.0.1']
+        extra = {'REMOTE_ADDR': remote_addr}
+        if token:
+            extra['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+        response = metrics_view(RequestFactory().get('/metrics', **extra))
+
+        assert response.status_code == status_code
+
+
+@pytest.mark.django_db
+def test_import_csv_counts_rows():
+    from reviews.management.commands.import_csv import CSV_DIR, CSV_FILES
+
+    before = dict(metrics.IMPORT_ROWS.values)
+    call_command('import_csv')
+
+    for table in CSV_FILES:
+        with open(os.path.join(CSV_DIR, f'{table}.csv'), newline='') as csv_file:
+            rows = len(list(csv.DictReader(csv_file)))
+        assert metrics.IMPORT_ROWS.values[(table,)] - before.get((table,), 0) == rows, (
+            f'Проверьте, что import_csv считает строки таблицы {table}'
+        )
+        assert metrics.IMPORT_SECONDS.values[(table,)] > 0
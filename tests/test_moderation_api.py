@@ -0,0 +1,90 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Change, Comment, Review, Title, User
+
+
+def client_for(username, role='user'):
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create(username=username, email=f'{username}@example.com', role=role)
+    )
+    return client
+
+
+@pytest.fixture
+def review(settings):
+    settings.DELETION_CHUNK_SIZE = 1
+    category = Category.objects.create(name='Фильм', slug='movie')
+    title = Title.objects.create(name='Солярис', year=1972, category=category)
+    author = User.objects.create(username='critic', email='critic@example.com')
+    review = Review.objects.create(title=title, author=author, text='Отзыв', score=8)
+    for text in ('Согласен', 'Не согласен'):
+        Comment.objects.create(review=review, author=author, text=text)
+    Change.objects.all().delete()
+    return review
+
+
+def moderate(client, target, **data):
+    return client.post(f'/api/v1/moderation/{target}/', data, format='json')
+
+
+def listed(url):
+    return APIClient().get(url).json()['results']
+
+
+def comments_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+
+
+def logged(table, action):
+    return Change.objects.filter(table=table, action=action).count()
+
+
+@pytest.mark.django_db
+class TestModeration:
+
+    def test_plain_user_cannot_hide(self, review):
+        response = moderate(client_for('reader'), 'comments', action='hide', author='critic')
+
+        assert response.status_code == 403, (
+            'Проверьте, что скрывать записи может только модератор'
+        )
+        assert not Comment.objects.filter(is_hidden=True).exists()
+
+    def test_hide_and_show_comments(self, review):
+        moderator = client_for('moderator', 'moderator')
+        response = moderate(moderator, 'comments', action='hide', author='critic')
+
+        assert response.json() == {'action': 'hide', 'matched': 2, 'affected': 2}
+        assert Comment.objects.filter(is_hidden=True).count() == 2
+        assert listed(comments_url(review)) == [], (
+            'Проверьте, что скрытые комментарии не попадают в список'
+        )
+        assert logged('comments', 'delete') == 2, (
+            'Проверьте, что скрытие записывается в журнал изменений как удаление'
+        )
+
+        moderate(moderator, 'comments', action='show', author='critic')
+
+        assert len(listed(comments_url(review))) == 2
+        assert logged('comments', 'create') == 2
+
+    def test_hide_reviews(self, review):
+        moderate(client_for('moderator', 'moderator'), 'reviews', action='hide', ids=[review.pk])
+
+        assert Review.objects.get().is_hidden
+        assert listed(f'/api/v1/titles/{review.title_id}/reviews/') == [], (
+            'Проверьте, что скрытые отзывы не попадают в список'
+        )
+        assert logged('review', 'delete') == 1
+
+    def test_delete(self, review):
+        response = moderate(
+            client_for('moderator', 'moderator'), 'reviews', action='delete', ids=[review.pk]
+        )
+
+        assert response.json() == {'action': 'delete', 'matched': 1, 'affected': 3}
+        assert not Review.objects.exists() and not Comment.objects.exists()
+        assert logged('review', 'delete') == 1
+        assert logged('comments', 'delete') == 2
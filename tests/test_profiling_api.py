@@ -0,0 +1,88 @@
+import cProfile
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api_yamdb import middleware
+from api_yamdb.profiling import list_dumps, parse_dump_name, save_profile
+from reviews.models import User
+
+
+@pytest.fixture
+def profiled(settings, monkeypatch):
+    """Запросы, выполненные под профилировщиком."""
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0
+    settings.PROFILING_SLOW_MS = 0
+    monkeypatch.setattr(middleware, 'save_profile', lambda *args: None)
+    requests = []
+
+    class Profile:
+        def enable(self):
+            requests.append(self)
+
+        def disable(self):
+            pass
+
+    monkeypatch.setattr(middleware.cProfile, 'Profile', Profile)
+    return requests
+
+
+def send(**extra):
+    profiling = middleware.ProfilingMiddleware(lambda request: HttpResponse())
+    profiling(RequestFactory().get('/api/v1/titles/', HTTP_X_PROFILE='1', **extra))
+
+
+def bearer(role):
+    user = User.objects.create(username=role, email=f'{role}@example.com', role=role)
+    return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+
+    def test_anonymous_header_is_ignored(self, profiled):
+        send()
+
+        assert not profiled, (
+            'Проверьте, что анонимный запрос с X-Profile не профилируется'
+        )
+
+    def test_invalid_token_is_ignored(self, profiled):
+        send(HTTP_AUTHORIZATION='Bearer x')
+
+        assert not profiled, (
+            'Проверьте, что X-Profile с недействительным токеном не профилируется'
+        )
+
+    def test_non_admin_is_ignored(self, profiled):
+        send(HTTP_AUTHORIZATION=bearer('user'))
+
+        assert not profiled
+
+    def test_admin_is_profiled(self, profiled):
+        send(HTTP_AUTHORIZATION=bearer('admin'))
+
+        assert len(profiled) == 1
+
+
+class TestProfileDumps:
+
+    def test_rotation_keeps_latest_and_foreign_files(self, settings, tmp_path):
+        settings.PROFILING_DIR = str(tmp_path)
+        settings.PROFILING_MAX_DUMPS = 2
+        foreign = tmp_path / 'manual.prof'
+        foreign.write_text('')
+
+        for elapsed in range(3):
+            save_profile(cProfile.Profile(), 'api:titles-list', elapsed)
+
+        dumps = list_dumps()
+        assert [parse_dump_name(path) for path in dumps] == [
+            ('api_titles-list', 1), ('api_titles-list', 2)
+        ], 'Проверьте, что хранятся только последние PROFILING_MAX_DUMPS дампов'
+        assert foreign.exists() and parse_dump_name(str(foreign)) is None, (
+            'Проверьте, что посторонние файлы не разбираются и не удаляются'
+        )
@@ -0,0 +1,50 @@
+import pytest
+from django.core.cache import caches
+
+from reviews.cache import genre_cache
+from reviews.models import Genre
+
+
+@pytest.fixture
+def shared_cache(settings, monkeypatch):
+    settings.SLUG_CACHE_ALIAS = 'default'
+    settings.SLUG_CACHE_SYNC_SECONDS = 60
+    caches['default'].clear()
+    Genre.objects.create(name='Драма', slug='drama')
+    genre_cache.synced_at = None
+    reads = []
+    get = caches['default'].get
+
+    def counting_get(key, *args, **kwargs):
+        reads.append(key)
+        return get(key, *args, **kwargs)
+
+    monkeypatch.setattr(caches['default'], 'get', counting_get)
+    yield reads
+    caches['default'].clear()
+
+
+@pytest.mark.django_db
+class TestSlugCacheSync:
+
+    def test_shared_version_read_once_per_interval(self, shared_cache):
+        genre_cache.get('drama')
+        genre_cache.get('drama')
+
+        assert len(shared_cache) == 1, (
+            'Проверьте, что версия кэша в общем кэше читается не чаще раза в интервал'
+        )
+
+    def test_changes_of_other_workers_are_picked_up(
+        self, shared_cache, django_assert_num_queries
+    ):
+        genre_cache.get('drama')
+        caches['default'].set(genre_cache.version_key, 'other-worker')
+        genre_cache.synced_at -= 60
+
+        with django_assert_num_queries(1):
+            assert genre_cache.get('drama').slug == 'drama'
+
+        assert genre_cache.version == 'other-worker', (
+            'Проверьте, что по истечении интервала кэш сверяется с общим'
+        )
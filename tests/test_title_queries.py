@@ -0,0 +1,73 @@
+import pytest
+
+from api.serializers import TitleSerializer
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+        Genre.objects.create(name='Триллер', slug='thriller'),
+    ]
+    return category, genres
+
+
+def save_title(data, instance=None):
+    serializer = TitleSerializer(instance, data=data, partial=instance is not None)
+    assert serializer.is_valid(), serializer.errors
+    return serializer
+
+
+@pytest.mark.django_db
+class TestTitleSerializerQueries:
+
+    def test_create(self, catalog, django_assert_num_queries):
+        serializer = save_title({
+            'name': 'Побег из Шоушенка',
+            'year': 1994,
+            'genre': ['drama', 'comedy'],
+            'category': 'movie',
+        })
+
+        # Произведение, журнал изменений, пустая статистика и жанры.
+        with django_assert_num_queries(4):
+            title = serializer.save()
+
+        assert set(title.genre.values_list('slug', flat=True)) == {'drama', 'comedy'}, (
+            'Проверьте, что при создании произведения сохраняются все жанры'
+        )
+
+    def test_update_without_changes(self, catalog, django_assert_num_queries):
+        category, genres = catalog
+        title = Title.objects.create(name='Крёстный отец', year=1972, category=category)
+        title.genre.set(genres[:2])
+        serializer = save_title(
+            {'name': 'Крёстный отец', 'genre': ['comedy', 'drama']}, title
+        )
+
+        with django_assert_num_queries(1):
+            serializer.save()
+
+    def test_update_changed_fields(self, catalog, django_assert_num_queries):
+        category, genres = catalog
+        title = Title.objects.create(name='Крёстный отец', year=1972, category=category)
+        title.genre.set(genres[:2])
+        serializer = save_title(
+            {'name': 'Крёстный отец 2', 'year': 1972, 'genre': ['drama', 'thriller']},
+            title,
+        )
+
+        with django_assert_num_queries(5) as context:
+            serializer.save()
+
+        update = next(
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        )
+        assert '"year"' not in update, (
+            'Проверьте, что при обновлении сохраняются только изменённые поля'
+        )
+        assert set(title.genre.values_list('slug', flat=True)) == {'drama', 'thriller'}
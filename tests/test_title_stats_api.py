@@ -0,0 +1,63 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Review, Title, TitleStats, User
+
+
+@pytest.fixture
+def legacy_titles():
+    """Произведения с отзывами, но без сохранённой статистики."""
+    category = Category.objects.create(name='Фильм', slug='movie')
+    author = User.objects.create(username='critic', email='critic@example.com')
+    titles = []
+
+    for score, name in ((8, 'Солярис'), (6, 'Сталкер')):
+        title = Title.objects.create(name=name, year=1972, category=category)
+        Review.objects.create(title=title, author=author, text='Отзыв', score=score)
+        titles.append(title)
+
+    TitleStats.objects.all().delete()
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitleStatsFallback:
+
+    def test_detail(self, legacy_titles):
+        title = legacy_titles[0]
+        response = APIClient().get(
+            f'/api/v1/titles/{title.pk}/', {'include': 'stats'}
+        )
+
+        assert response.status_code == 200
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что рейтинг считается и без сохранённой статистики'
+        )
+        assert response.json()['stats']['review_count'] == 1
+
+    def test_list(self, legacy_titles, django_assert_max_num_queries):
+        client = APIClient()
+
+        # Счётчик, страница, жанры, статистика и прогрев кэша категорий.
+        with django_assert_max_num_queries(5):
+            response = client.get('/api/v1/titles/')
+
+        ratings = {
+            title['name']: title['rating'] for title in response.json()['results']
+        }
+        assert ratings == {'Солярис': 8, 'Сталкер': 6}, (
+            'Проверьте, что недостающая статистика списка считается одним запросом'
+        )
+        assert not TitleStats.objects.exists(), (
+            'Проверьте, что чтение не сохраняет статистику'
+        )
+
+    def test_new_title_has_stats_row(self, legacy_titles):
+        title = Title.objects.create(
+            name='Зеркало', year=1975, category=Category.objects.get()
+        )
+
+        stats = TitleStats.objects.get(title=title)
+        assert (stats.review_count, stats.rating) == (0, None), (
+            'Проверьте, что у нового произведения сразу есть пустая статистика'
+        )
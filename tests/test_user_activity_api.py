@@ -0,0 +1,82 @@
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Review, Title, User
+
+
+@pytest.fixture
+def author():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    author = User.objects.create(username='critic', email='critic@example.com')
+    for number in range(5):
+        title = Title.objects.create(
+            name=f'Фильм {number}', year=2000, category=category
+        )
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=8
+        )
+        Comment.objects.create(review=review, author=author, text='Согласен')
+    # Одинаковая дата у всех записей: порядок задаёт только id.
+    now = timezone.now()
+    Review.objects.update(pub_date=now)
+    Comment.objects.update(pub_date=now)
+    return author
+
+
+def walk(url):
+    """Ids of all pages of a cursor-paginated listing."""
+    client = APIClient()
+    ids = []
+    while url:
+        data = client.get(url).json()
+        ids.extend(item['id'] for item in data['results'])
+        url = data['next']
+    return ids
+
+
+@pytest.mark.django_db
+class TestUserActivity:
+
+    @pytest.mark.parametrize('kind, model', [
+        ('reviews', Review), ('comments', Comment),
+    ])
+    def test_paging_over_equal_dates(self, author, kind, model):
+        ids = walk(f'/api/v1/users/{author.username}/{kind}/?limit=2')
+
+        assert ids == sorted(model.objects.values_list('id', flat=True), reverse=True), (
+            'Проверьте, что при одинаковой pub_date страницы упорядочены по '
+            '-id без пропусков и повторов'
+        )
+
+    def test_hidden_comments_excluded(self, author):
+        first, second, *_ = Comment.objects.order_by('id')
+        Comment.objects.filter(pk=first.pk).update(is_hidden=True)
+        Review.objects.filter(pk=second.review_id).update(is_hidden=True)
+
+        ids = walk(f'/api/v1/users/{author.username}/comments/')
+
+        assert first.pk not in ids and second.pk not in ids, (
+            'Проверьте, что скрытые комментарии и комментарии к скрытым '
+            'отзывам не показываются'
+        )
+        assert len(ids) == 3
+
+    @pytest.mark.parametrize('kind', ['reviews', 'comments'])
+    def test_title_name_in_same_query(self, author, kind, django_assert_num_queries):
+        # Автор и страница записей вместе с названиями произведений.
+        with django_assert_num_queries(2):
+            response = APIClient().get(f'/api/v1/users/{author.username}/{kind}/')
+
+        assert response.status_code == 200
+        assert {item['title_name'] for item in response.json()['results']} == {
+            f'Фильм {number}' for number in range(5)
+        }
+
+    @pytest.mark.parametrize('kind', ['reviews', 'comments'])
+    def test_unknown_user(self, kind):
+        response = APIClient().get(f'/api/v1/users/ghost/{kind}/')
+
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего пользователя возвращается 404'
+        )